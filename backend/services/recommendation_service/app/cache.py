@@ -0,0 +1,602 @@
+# services/recommendation-service/app/cache.py
+#
+# Caches for computed recommendations, plus the "computation in flight"
+# claims used to dedupe work. Three interchangeable backends:
+#
+#   MemoryCache  - per process (default; one worker)
+#   SQLiteCache  - a SQLite file shared by every worker on one host
+#   RedisCache   - any server speaking the Redis protocol, shared by
+#                  workers and replicas
+#
+# Shared backends store JSON, so values must be JSON-serialisable.
+
+import json
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from urllib.parse import urlparse
+
+from pydantic import BaseModel
+
+
+def _estimate_size(obj: Any, _seen: Optional[set[int]] = None) -> int:
+    """
+    Rough deep size in bytes of a cached value: containers, strings and
+    pydantic models are walked, shared objects are counted once.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(
+            _estimate_size(k, _seen) + _estimate_size(v, _seen)
+            for k, v in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(item, _seen) for item in obj)
+    elif isinstance(obj, BaseModel):
+        size += _estimate_size(obj.__dict__, _seen)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "version", "stored_at", "size")
+
+    def __init__(self, value: Any, version: str, size: int):
+        self.value = value
+        self.version = version
+        self.stored_at = time.monotonic()
+        self.size = size
+
+
+class CacheBackend(ABC):
+    """
+    Interface shared by the cache backends.
+
+    Values are tagged with a version string; a lookup with a different
+    version is a miss. claim()/release() mark a key as being computed so
+    that only one worker computes it; claims expire after claim_ttl in
+    case the claiming worker dies. A claim records the priority it was
+    queued at (lower is more urgent), so promote() can tell a caller that
+    an existing claim is queued behind less urgent work. Every method is
+    abstract, so a backend that misses one fails when it is constructed.
+    """
+
+    claim_ttl: float = 120
+
+    @abstractmethod
+    def get(self, key: Hashable, version: Optional[str] = None) -> Any:
+        ...
+
+    @abstractmethod
+    def contains(self, key: Hashable, version: Optional[str] = None) -> bool:
+        ...
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, version: str = "") -> None:
+        ...
+
+    @abstractmethod
+    def claim(self, key: Hashable, priority: int = 0) -> bool:
+        """Marks `key` as being computed. False if already claimed."""
+
+    @abstractmethod
+    def promote(self, key: Hashable, priority: int) -> bool:
+        """
+        Lowers a live claim's priority to `priority`. True if the claim was
+        held at a less urgent priority, i.e. the caller should queue the
+        computation again at `priority`.
+        """
+
+    @abstractmethod
+    def release(self, key: Hashable) -> None:
+        ...
+
+    @abstractmethod
+    def is_claimed(self, key: Hashable) -> bool:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class MemoryCache(CacheBackend):
+    """
+    LRU cache with a TTL, an entry cap and a byte budget.
+
+    A lookup with a different version tag is a miss and drops the entry
+    (see CacheBackend). Expired
+    entries are removed, not just ignored, so memory is actually released.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = 10_000,
+            max_bytes: int = 64 * 1024 * 1024,
+            ttl: float = 120,
+            ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._last_purge = time.monotonic()
+        # key -> (expires_at, priority)
+        self._claims: dict[Hashable, tuple[float, int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _live_entry(self, key: Hashable, version: Optional[str]) -> Optional[_Entry]:
+        """Returns the entry if present, unexpired and of `version`."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.stored_at >= self.ttl:
+            self._drop(key)
+            self.expirations += 1
+            return None
+        if version is not None and entry.version != version:
+            self._drop(key)
+            return None
+        return entry
+
+    def get(self, key: Hashable, version: Optional[str] = None) -> Any:
+        """Returns the cached value, or None on a miss."""
+        with self._lock:
+            entry = self._live_entry(key, version)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def contains(self, key: Hashable, version: Optional[str] = None) -> bool:
+        """Like get() but without touching LRU order or hit counters."""
+        with self._lock:
+            return self._live_entry(key, version) is not None
+
+    def set(self, key: Hashable, value: Any, version: str = "") -> None:
+        size = _estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = _Entry(value, version, size)
+            self._bytes += size
+
+            now = time.monotonic()
+            if now - self._last_purge >= self.ttl:
+                self._purge_expired(now)
+            while (
+                len(self._entries) > self.max_entries
+                or self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [
+            key for key, entry in self._entries.items()
+            if now - entry.stored_at >= self.ttl
+        ]
+        for key in expired:
+            self._drop(key)
+        self.expirations += len(expired)
+        self._last_purge = now
+
+    def claim(self, key: Hashable, priority: int = 0) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._claims.get(key, (0, 0))[0] > now:
+                return False
+            self._claims[key] = (now + self.claim_ttl, priority)
+            return True
+
+    def promote(self, key: Hashable, priority: int) -> bool:
+        with self._lock:
+            expires_at, claimed_priority = self._claims.get(key, (0, 0))
+            if expires_at <= time.monotonic() or claimed_priority <= priority:
+                return False
+            self._claims[key] = (expires_at, priority)
+            return True
+
+    def release(self, key: Hashable) -> None:
+        with self._lock:
+            self._claims.pop(key, None)
+
+    def is_claimed(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._claims.get(key, (0, 0))[0] > time.monotonic()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "claims": len(self._claims),
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache stored in a SQLite file, so every worker process on a host sees
+    the same entries and claims. LRU order is tracked with an accessed_at
+    column; expired entries are purged once per TTL.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10_000, ttl: float = 120):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        self._last_purge = 0.0
+        # Counters are per process; entries and claims are shared.
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, version TEXT NOT NULL,"
+                " value TEXT NOT NULL, stored_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed_at"
+                " ON entries (accessed_at)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS claims ("
+                " key TEXT PRIMARY KEY, expires_at REAL NOT NULL,"
+                " priority INTEGER NOT NULL DEFAULT 0)"
+            )
+            # Files created before claims recorded their priority
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(claims)")}
+            if "priority" not in columns:
+                conn.execute(
+                    "ALTER TABLE claims ADD COLUMN priority INTEGER NOT NULL DEFAULT 0"
+                )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _live_value(
+            self, key: Hashable, version: Optional[str], touch: bool
+            ) -> Optional[str]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT version, value, stored_at FROM entries WHERE key = ?",
+            (str(key),),
+        ).fetchone()
+        if row is None:
+            return None
+        stored_version, value, stored_at = row
+        now = time.time()
+        if now - stored_at >= self.ttl:
+            conn.execute("DELETE FROM entries WHERE key = ?", (str(key),))
+            self.expirations += 1
+            return None
+        if version is not None and stored_version != version:
+            conn.execute("DELETE FROM entries WHERE key = ?", (str(key),))
+            return None
+        if touch:
+            conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                (now, str(key)),
+            )
+        return value
+
+    def get(self, key: Hashable, version: Optional[str] = None) -> Any:
+        value = self._live_value(key, version, touch=True)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def contains(self, key: Hashable, version: Optional[str] = None) -> bool:
+        return self._live_value(key, version, touch=False) is not None
+
+    def set(self, key: Hashable, value: Any, version: str = "") -> None:
+        conn = self._connection()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries"
+            " (key, version, value, stored_at, accessed_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (str(key), version, json.dumps(value), now, now),
+        )
+        if now - self._last_purge >= self.ttl:
+            self.expirations += conn.execute(
+                "DELETE FROM entries WHERE stored_at <= ?", (now - self.ttl,)
+            ).rowcount
+            conn.execute("DELETE FROM claims WHERE expires_at <= ?", (now,))
+            self._last_purge = now
+        (count,) = conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.max_entries:
+            self.evictions += conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,),
+            ).rowcount
+
+    def claim(self, key: Hashable, priority: int = 0) -> bool:
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM claims WHERE key = ? AND expires_at <= ?",
+                (str(key), now),
+            )
+            claimed = conn.execute(
+                "INSERT OR IGNORE INTO claims (key, expires_at, priority)"
+                " VALUES (?, ?, ?)",
+                (str(key), now + self.claim_ttl, priority),
+            ).rowcount == 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return claimed
+
+    def promote(self, key: Hashable, priority: int) -> bool:
+        # One statement, so two requests cannot both promote the claim.
+        return self._connection().execute(
+            "UPDATE claims SET priority = ?"
+            " WHERE key = ? AND expires_at > ? AND priority > ?",
+            (priority, str(key), time.time(), priority),
+        ).rowcount == 1
+
+    def release(self, key: Hashable) -> None:
+        self._connection().execute(
+            "DELETE FROM claims WHERE key = ?", (str(key),)
+        )
+
+    def is_claimed(self, key: Hashable) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM claims WHERE key = ? AND expires_at > ?",
+            (str(key), time.time()),
+        ).fetchone()
+        return row is not None
+
+    def stats(self) -> dict:
+        conn = self._connection()
+        (entries,) = conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        (claims,) = conn.execute(
+            "SELECT COUNT(*) FROM claims WHERE expires_at > ?", (time.time(),)
+        ).fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "claims": claims,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisError(Exception):
+    """An error reply from the Redis server."""
+
+
+class _RespConnection:
+    """
+    Minimal Redis protocol (RESP2) client: enough for GET/SET/DEL/EXISTS,
+    without adding a client library dependency.
+    """
+
+    def __init__(self, host: str, port: int, db: int, password: Optional[str],
+                 timeout: float):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._file = self._sock.makefile("rb")
+        if password:
+            self.command("AUTH", password)
+        if db:
+            self.command("SELECT", db)
+
+    def close(self):
+        try:
+            self._file.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+    def command(self, *args) -> Any:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            if count == -1:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache kept in a Redis-protocol server, shared by every worker and
+    replica. Expiry uses the server's own key TTLs; memory bounds and
+    eviction are left to the server's maxmemory policy.
+    """
+
+    def __init__(self, url: str, ttl: float = 120, prefix: str = "align:rec:",
+                 timeout: float = 2.0):
+        parsed = urlparse(url)
+        self._host = parsed.hostname or "localhost"
+        self._port = parsed.port or 6379
+        self._db = int(parsed.path.lstrip("/") or 0)
+        self._password = parsed.password
+        self._timeout = timeout
+        self.url = f"{parsed.scheme}://{self._host}:{self._port}/{self._db}"
+        self.ttl = ttl
+        self.prefix = prefix
+        self._conn: Optional[_RespConnection] = None
+        self._lock = threading.Lock()
+        # Counters are per process; entries and claims are shared.
+        self.hits = 0
+        self.misses = 0
+
+    def _command(self, *args) -> Any:
+        with self._lock:
+            for attempt in range(2):
+                if self._conn is None:
+                    self._conn = _RespConnection(
+                        self._host, self._port, self._db, self._password,
+                        self._timeout,
+                    )
+                try:
+                    return self._conn.command(*args)
+                except (OSError, ConnectionError):
+                    # Reconnect once: the server may have dropped an idle
+                    # connection.
+                    self._conn.close()
+                    self._conn = None
+                    if attempt:
+                        raise
+
+    def _entry_key(self, key: Hashable) -> str:
+        return f"{self.prefix}entry:{key}"
+
+    def _claim_key(self, key: Hashable) -> str:
+        return f"{self.prefix}claim:{key}"
+
+    def _live_entry(self, key: Hashable, version: Optional[str]) -> Optional[dict]:
+        raw = self._command("GET", self._entry_key(key))
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        if version is not None and entry["version"] != version:
+            self._command("DEL", self._entry_key(key))
+            return None
+        return entry
+
+    def get(self, key: Hashable, version: Optional[str] = None) -> Any:
+        entry = self._live_entry(key, version)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["value"]
+
+    def contains(self, key: Hashable, version: Optional[str] = None) -> bool:
+        return self._live_entry(key, version) is not None
+
+    def set(self, key: Hashable, value: Any, version: str = "") -> None:
+        payload = json.dumps({"version": version, "value": value})
+        self._command(
+            "SET", self._entry_key(key), payload, "PX", int(self.ttl * 1000)
+        )
+
+    def claim(self, key: Hashable, priority: int = 0) -> bool:
+        reply = self._command(
+            "SET", self._claim_key(key), priority,
+            "NX", "PX", int(self.claim_ttl * 1000),
+        )
+        return reply == "OK"
+
+    def promote(self, key: Hashable, priority: int) -> bool:
+        # GET then SET XX is not atomic; two requests racing here both
+        # queue an interactive job, which costs one duplicate computation.
+        claim_key = self._claim_key(key)
+        claimed = self._command("GET", claim_key)
+        if claimed is None or int(claimed) <= priority:
+            return False
+        ttl_ms = self._command("PTTL", claim_key)
+        if ttl_ms is None or int(ttl_ms) <= 0:
+            return False
+        return self._command("SET", claim_key, priority, "XX", "PX", int(ttl_ms)) == "OK"
+
+    def release(self, key: Hashable) -> None:
+        self._command("DEL", self._claim_key(key))
+
+    def is_claimed(self, key: Hashable) -> bool:
+        return bool(self._command("EXISTS", self._claim_key(key)))
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "url": self.url,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def create_cache(
+        backend: str = "memory",
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 120,
+        sqlite_path: str = "/tmp/align_recommendation_cache.sqlite3",
+        redis_url: str = "redis://localhost:6379/0",
+        ) -> CacheBackend:
+    """Builds the cache backend named by `backend`."""
+    if backend == "memory":
+        return MemoryCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteCache(sqlite_path, max_entries=max_entries, ttl=ttl)
+    if backend == "redis":
+        return RedisCache(redis_url, ttl=ttl)
+    raise ValueError(f"Unknown cache backend: {backend!r}")
@@ -1,9 +1,20 @@
 # services/recommendation-service/app/core.py
 
+import copy
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+from sklearn.decomposition import TruncatedSVD
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.metrics.pairwise import linear_kernel
+from sklearn.preprocessing import normalize
+from scipy import sparse
 from shared.core import models
+from shared.core.keywords import KeywordMatcher, contains_keyword
 import numpy as np
+from .metrics import stage
 
 # ---------------------------------------------------------------------------
 # Domain clusters used for cross-domain penalty.
@@ -68,24 +79,263 @@ ROLE_SYNONYMS: dict[str, list[str]] = {
     "ai": ["machine learning", "ml", "data", "nlp"],
 }
 
+# Bit position of each domain in the per-internship domain masks built by
+# fit(). Eight clusters fit comfortably in a uint16 with room to grow.
+DOMAIN_BITS: dict[str, int] = {
+    domain: 1 << i for i, domain in enumerate(DOMAIN_CLUSTERS)
+}
+
+# Compiled once: domain detection scans a text in one pass for all clusters,
+# and the title index finds every ROLE_SYNONYMS word in a title at once.
+_DOMAIN_MATCHER = KeywordMatcher(DOMAIN_CLUSTERS)
+_ROLE_KEYWORDS = sorted(
+    set(ROLE_SYNONYMS) | {kw for synonyms in ROLE_SYNONYMS.values() for kw in synonyms}
+)
+_ROLE_KEYWORD_SET = frozenset(_ROLE_KEYWORDS)
+_ROLE_MATCHER = KeywordMatcher({kw: [kw] for kw in _ROLE_KEYWORDS})
+
+# Upper bound on memoised title-keyword masks. Role words come from free
+# text, so the memo is cleared rather than allowed to grow without limit.
+_MAX_TITLE_KEYWORD_MASKS = 4096
+
+# Tokens for match reasons: words plus the punctuation that belongs to
+# technology names (c++, c#, node.js).
+_REASON_TOKEN = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+
+
+def _reason_tokens(text: str) -> list[str]:
+    """
+    Lower-cased reason tokens with a trailing plural "s" dropped, so
+    "Developers" still matches the role word "developer".
+    """
+    return [
+        t[:-1] if len(t) > 3 and t.endswith('s') and not t.endswith('ss') else t
+        for t in _REASON_TOKEN.findall(text.lower())
+    ]
+
+
+def _normalize_value(value: Optional[str]) -> str:
+    """Lower-cased with whitespace collapsed, for location/source codes."""
+    return ' '.join((value or '').lower().split())
+
+
+def _encode_values(
+        table: list[str],
+        values: list[str],
+        code_of: Optional[dict[str, int]] = None,
+        ) -> np.ndarray:
+    """
+    Codes of `values` in `table`, appending values not seen before. Pass
+    the same `code_of` (value -> code of `table`) across calls that
+    extend one table to avoid rebuilding it each time.
+    """
+    if code_of is None:
+        code_of = {value: code for code, value in enumerate(table)}
+    codes = np.empty(len(values), dtype=np.int32)
+    for row, value in enumerate(values):
+        code = code_of.get(value)
+        if code is None:
+            code = code_of[value] = len(table)
+            table.append(value)
+        codes[row] = code
+    return codes
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU mapping with hit/miss counters."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class StudentVectorCache(LRUCache):
+    """
+    Bounded LRU of compiled student vectors, keyed by
+    (vocabulary version, profile hash). An entry stays valid for as long
+    as the student's profile and the vectorizer's vocabulary/IDF are
+    unchanged, so incremental corpus updates keep it warm. Shared by a
+    recommender and its copies; safe to use from several threads.
+    """
+
+
+class InternshipRowCache(LRUCache):
+    """
+    Recently returned internship rows, keyed by id, so popular postings
+    are not re-read from the database on every request. Shared by a
+    recommender and its copies; ids re-indexed by add_internships() are
+    dropped so their new contents are loaded.
+    """
+
+    def __init__(self, max_entries: int = 2000):
+        super().__init__(max_entries)
+
+    def get_many(self, internship_ids: list[int]) -> dict[int, models.Internship]:
+        with self._lock:
+            found = {}
+            for internship_id in internship_ids:
+                row = self._entries.get(internship_id)
+                if row is None:
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(internship_id)
+                self.hits += 1
+                found[internship_id] = row
+            return found
+
+    def set_many(self, rows: list[models.Internship]):
+        for row in rows:
+            self.set(row.id, row)
+
+    def discard(self, internship_ids: list[int]):
+        with self._lock:
+            for internship_id in internship_ids:
+                self._entries.pop(internship_id, None)
+
 
 class TFIDFRecommender:
-    def __init__(self):
+    # Name used to select this engine per deployment (see create_recommender).
+    ENGINE = "tfidf"
+
+    def __init__(
+            self,
+            refit_drift: float = 0.2,
+            student_cache: Optional[StudentVectorCache] = None,
+            row_cache: Optional[InternshipRowCache] = None,
+            matrix_dtype: str = "float64",
+            max_terms: int = 0,
+            ):
         # Initialize the vectorizer with English stop words
-        self.vectorizer = TfidfVectorizer(stop_words='english', min_df=1)
+        self.vectorizer = self._new_vectorizer()
+        # Identifies the fitted vocabulary and IDF weights; changes only on
+        # a full fit, not on incremental updates.
+        self.vocabulary_version = ""
+        # Tokenizer of the vectorizer's configuration, built on first use.
+        self._analyzer = None
+        # Student vectors for unchanged profiles are reused across calls
+        # (and across copies of this model) instead of re-tokenized.
+        self.student_cache = (
+            student_cache if student_cache is not None else StudentVectorCache()
+        )
+        # Identifies the corpus this model was built from; set by whoever
+        # publishes the model and used to tag cached recommendations.
+        self.version = ""
         self.internship_matrix = None
-        self.internships = []
+        self.internship_ids = np.zeros(0, dtype=np.int64)
+        # The recommender keeps no ORM rows (or their HTML descriptions),
+        # only the compact per-row arrays below. The handful of rows it
+        # returns are fetched by id through row_loader, with recently
+        # returned ones kept in row_cache.
+        self.row_loader: Optional[
+            Callable[[list[int]], list[models.Internship]]
+            ] = None
+        self.row_cache = row_cache if row_cache is not None else InternshipRowCache()
+        # Incremental updates reuse the vocabulary and IDF weights of the
+        # last full fit. Once the rows added/removed since then would exceed
+        # refit_drift × the fitted corpus size, _needs_refit() tells the
+        # caller to build a full fit instead (the scheduler streams it).
+        self.refit_drift = refit_drift
+        # Storage of the internship matrix: values as `matrix_dtype`, and,
+        # if `max_terms` is set, only each row's max_terms highest-weight
+        # terms (re-normalised). See _compact().
+        self.matrix_dtype = np.dtype(matrix_dtype)
+        self.max_terms = max_terms
+        self._fitted_size = 0
+        self._incremental_changes = 0
+        # Per-internship domain bitmask (see DOMAIN_BITS), built by fit().
+        self.internship_domain_masks = np.zeros(0, dtype=np.uint16)
+        # Title index: each row points at one entry of the de-duplicated,
+        # lower-cased title list, so keyword scans run once per distinct
+        # title rather than once per internship.
+        self._unique_titles: list[str] = []
+        self._title_codes = np.zeros(0, dtype=np.intp)
+        self._title_keyword_masks: dict[str, np.ndarray] = {}
+        # Reason index: the distinct reason tokens of each internship's
+        # title + description as a rows × tokens boolean CSR matrix, so
+        # match reasons are set intersections instead of text scans.
+        self._reason_vocabulary: dict[str, int] = {}
+        self._reason_index = sparse.csr_matrix((0, 0), dtype=bool)
+        # Filter columns: each row's normalised location and source as a
+        # code into a table of distinct values, and created_at as epoch
+        # seconds (0 if unknown). See filter_mask().
+        self._locations: list[str] = []
+        self._location_codes = np.zeros(0, dtype=np.int32)
+        self._sources: list[str] = []
+        self._source_codes = np.zeros(0, dtype=np.int32)
+        self.internship_created_at = np.zeros(0, dtype=np.int64)
 
-    def _compile_student_document(self, student: models.Student) -> str:
+    def variant(self) -> str:
         """
-        Creates a single text document for a student, weighting important
-        fields by repetition.
+        Engine plus any non-default matrix storage, e.g.
+        "tfidf:float32:top200". Models of different variants score
+        differently, so the variant is part of the published version.
         """
-        text_parts = []
+        parts = [self.ENGINE]
+        if self.matrix_dtype != np.float64:
+            parts.append(self.matrix_dtype.name)
+        if self.max_terms:
+            parts.append(f"top{self.max_terms}")
+        return ":".join(parts)
+
+    @staticmethod
+    def _new_vectorizer() -> TfidfVectorizer:
+        return TfidfVectorizer(stop_words='english', min_df=1)
+
+    def copy(self) -> "TFIDFRecommender":
+        """
+        Returns a copy that can be updated with add_internships() /
+        remove_internships() or refitted while this instance keeps
+        serving. Arrays are shared, since updates replace rather than
+        modify them.
+        """
+        clone = copy.copy(self)
+        clone._unique_titles = list(self._unique_titles)
+        clone._title_keyword_masks = dict(self._title_keyword_masks)
+        clone._reason_vocabulary = dict(self._reason_vocabulary)
+        clone._locations = list(self._locations)
+        clone._sources = list(self._sources)
+        return clone
+
+    def _student_fields(
+            self, student: models.Student
+            ) -> list[tuple[str, float]]:
+        """
+        The student's text fields paired with their term-count weights.
+        Each field is tokenized once and its counts scaled by the weight.
+        """
+        fields: list[tuple[str, float]] = []
 
         # 1. PREFERRED JOB ROLE (Weight: 8x) — most reliable signal
         if student.preferred_job_role:
-            text_parts.append((student.preferred_job_role + ' ') * 8)
+            fields.append((student.preferred_job_role, 8))
 
         # 2. LLM GENERATED KEYWORDS (Weight: 5x)
         # Reduced from 8x — was too dominant and caused off-domain matches
@@ -93,47 +343,226 @@ class TFIDFRecommender:
         # job descriptions.
         keywords = getattr(student, "search_keywords", None)
         if keywords:
-            text_parts.append((keywords + ' ') * 5)
+            fields.append((keywords, 5))
         else:
-            # Fallback: if the LLM hasn't run yet, repeat the role + major
+            # Fallback: if the LLM hasn't run yet, weight the role + major
             # so the high-weight slot isn't wasted.
             if student.preferred_job_role:
-                text_parts.append((student.preferred_job_role + ' ') * 4)
+                fields.append((student.preferred_job_role, 4))
             major = getattr(student, "major", None)
             if major:
-                text_parts.append((major + ' ') * 3)
+                fields.append((major, 3))
 
         # 3. EXISTING SKILLS (Weight: 4x) — raised from 1x
         skills = ' '.join([s.name for s in student.skills])
         if skills.strip():
-            text_parts.append((skills + ' ') * 4)
+            fields.append((skills, 4))
 
         # 4. SUMMARY & PROJECTS
         if student.summary:
-            text_parts.append((student.summary + ' ') * 2)
+            fields.append((student.summary, 2))
 
         for project in student.projects:
-            text_parts.append((project.title + ' ') * 2)
+            fields.append((project.title, 2))
             if project.technologies_used:
-                text_parts.append((project.technologies_used + ' ') * 2)
+                fields.append((project.technologies_used, 2))
             if project.description:
-                text_parts.append(project.description)
+                fields.append((project.description, 1))
+
+        return fields
+
+    @staticmethod
+    def _profile_hash(student: models.Student) -> str:
+        """
+        Digest of every profile field that feeds the student document or
+        the domain mask; equal digests give identical vectors.
+        """
+        parts = [
+            student.preferred_job_role or '',
+            getattr(student, "search_keywords", None) or '',
+            getattr(student, "major", None) or '',
+            student.summary or '',
+        ]
+        parts.extend(s.name for s in student.skills)
+        for project in student.projects:
+            parts.extend([
+                project.title or '',
+                project.technologies_used or '',
+                project.description or '',
+            ])
+        return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    def _student_vectors(
+            self, students: list[models.Student]
+            ) -> tuple[sparse.csr_matrix, np.ndarray]:
+        """
+        TF-IDF vectors and domain bitmasks for the given students. Profiles
+        seen before under the current vocabulary come from student_cache;
+        only the rest are compiled and transformed (in one call).
+        """
+        entries = [None] * len(students)
+        keys = []
+        missing = []
+        for row, student in enumerate(students):
+            key = (self.vocabulary_version, self._profile_hash(student))
+            keys.append(key)
+            entries[row] = self.student_cache.get(key)
+            if entries[row] is None:
+                missing.append(row)
 
-        return ' '.join(text_parts)
+        if missing:
+            with stage("compile"):
+                documents = [self._student_fields(students[r]) for r in missing]
+            with stage("vectorize"):
+                vectors = self._tfidf(self._weighted_counts(
+                    documents, self.vectorizer.vocabulary_,
+                    ))
+            for offset, row in enumerate(missing):
+                start, end = vectors.indptr[offset], vectors.indptr[offset + 1]
+                entry = (
+                    vectors.indices[start:end].copy(),
+                    vectors.data[start:end].copy(),
+                    self._domain_bitmask(self._get_student_domain(students[row])),
+                )
+                self.student_cache.set(keys[row], entry)
+                entries[row] = entry
 
-    def _compile_internship_document(
+        indptr = np.zeros(len(entries) + 1, dtype=np.int64)
+        np.cumsum([len(e[0]) for e in entries], out=indptr[1:])
+        matrix = sparse.csr_matrix(
+            (
+                np.concatenate([e[1] for e in entries]),
+                np.concatenate([e[0] for e in entries]),
+                indptr,
+            ),
+            shape=(len(entries), len(self.vectorizer.idf_)),
+            )
+        masks = np.fromiter(
+            (e[2] for e in entries), dtype=np.uint16, count=len(entries)
+            )
+        return matrix, masks
+
+    def _internship_fields(
             self,
             internship: models.Internship
-            ) -> str:
-        """Creates a single text document for an internship.
-        Title is repeated 3x so title-keyword matching dominates over
+            ) -> list[tuple[str, float]]:
+        """The internship's text fields paired with their term-count weights.
+        Title is weighted 3x so title-keyword matching dominates over
         description-volume effects."""
-        title = internship.title or ''
-        return ' '.join([
-            (title + ' ') * 3,
-            internship.company or '',
-            internship.description or ''
-        ])
+        return [
+            (internship.title or '', 3),
+            (internship.company or '', 1),
+            (internship.description or '', 1),
+        ]
+
+    def _weighted_counts(
+            self,
+            documents: list[list[tuple[str, float]]],
+            vocabulary: dict[str, int],
+            grow: bool = False,
+            ) -> sparse.csr_matrix:
+        """
+        Documents × vocabulary matrix of weighted term counts. A term's
+        count is the sum over fields of (occurrences × field weight), the
+        same counts the vectorizer would see if each field were repeated
+        `weight` times. Unknown terms are skipped, or appended to
+        `vocabulary` when `grow` is set.
+        """
+        if self._analyzer is None:
+            self._analyzer = self.vectorizer.build_analyzer()
+        analyze = self._analyzer
+
+        # One entry per token occurrence; duplicates are summed when the
+        # COO matrix is converted, which is far cheaper than per-document
+        # dicts in Python.
+        lookup = vocabulary.get
+        assign = vocabulary.setdefault
+        rows: list[int] = []
+        columns: list[int] = []
+        weights: list[float] = []
+        for row, fields in enumerate(documents):
+            for text, weight in fields:
+                if not text:
+                    continue
+                if grow:
+                    found = [assign(t, len(vocabulary)) for t in analyze(text)]
+                else:
+                    found = [c for c in map(lookup, analyze(text)) if c is not None]
+                columns.extend(found)
+                rows.extend([row] * len(found))
+                weights.extend([weight] * len(found))
+
+        counts = sparse.coo_matrix(
+            (
+                np.asarray(weights, dtype=np.float64),
+                (np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int32)),
+            ),
+            shape=(len(documents), len(vocabulary)),
+            ).tocsr()
+        counts.sum_duplicates()
+        return counts
+
+    def _tfidf(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Applies the fitted IDF weights and L2-normalises each row."""
+        counts.data *= self.vectorizer.idf_[counts.indices]
+        return normalize(counts, norm='l2', copy=False)
+
+    def _compact(self, matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+        """
+        Internship TF-IDF rows in the configured storage: pruned to the
+        max_terms highest weights per row and re-normalised, then cast to
+        matrix_dtype. Identity in the default configuration.
+        """
+        if self.max_terms and matrix.nnz:
+            row_of = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+            # Entries by row, heaviest first within a row; the first
+            # max_terms of each row are kept.
+            order = np.lexsort((-matrix.data, row_of))
+            rank = np.arange(len(order)) - matrix.indptr[row_of[order]]
+            kept = np.sort(order[rank < self.max_terms])
+            indptr = np.zeros(matrix.shape[0] + 1, dtype=matrix.indptr.dtype)
+            np.cumsum(np.bincount(row_of[kept], minlength=matrix.shape[0]), out=indptr[1:])
+            matrix = normalize(
+                sparse.csr_matrix(
+                    (matrix.data[kept], matrix.indices[kept], indptr), shape=matrix.shape
+                ),
+                norm='l2', copy=False,
+                )
+        if matrix.dtype != self.matrix_dtype:
+            matrix = matrix.astype(self.matrix_dtype)
+        return matrix
+
+    @staticmethod
+    def _widened(matrix: sparse.csr_matrix, columns: int) -> sparse.csr_matrix:
+        """`matrix` reshaped to `columns` columns, sharing its arrays."""
+        return sparse.csr_matrix(
+            (matrix.data, matrix.indices, matrix.indptr),
+            shape=(matrix.shape[0], columns),
+            )
+
+    def _fit_vectorizer(
+            self,
+            counts: sparse.csr_matrix,
+            vocabulary: dict[str, int],
+            ) -> sparse.csr_matrix:
+        """
+        Fits the vectorizer's vocabulary and IDF weights to term counts
+        built with _weighted_counts(grow=True) and returns their TF-IDF
+        matrix. Matches TfidfVectorizer's defaults: sorted vocabulary and
+        smoothed IDF, ln((1 + n) / (1 + df)) + 1.
+        """
+        # Renumber columns in term order, as the vectorizer does
+        terms = sorted(vocabulary)
+        remap = np.empty(len(terms), dtype=np.int32)
+        for new_column, term in enumerate(terms):
+            remap[vocabulary[term]] = new_column
+        counts.indices = remap[counts.indices]
+        counts.sort_indices()
+
+        df = np.bincount(counts.indices, minlength=len(terms))
+        self.vectorizer.vocabulary_ = {t: i for i, t in enumerate(terms)}
+        self.vectorizer.idf_ = np.log((1 + counts.shape[0]) / (1 + df)) + 1
+        return self._tfidf(counts)
 
     def _get_student_domain(self, student: models.Student) -> set[str]:
         """Returns the set of domain labels this student belongs to."""
@@ -142,79 +571,223 @@ class TFIDFRecommender:
             getattr(student, 'major', None) or '',
             getattr(student, 'search_keywords', None) or '',
             ' '.join([s.name for s in student.skills]),
-        ]).lower()
-        matched: set[str] = set()
-        for domain, keywords in DOMAIN_CLUSTERS.items():
-            if any(kw in combined for kw in keywords):
-                matched.add(domain)
-        return matched
+        ])
+        return _DOMAIN_MATCHER.groups(combined)
 
     def _get_internship_domain(self, internship: models.Internship) -> set[str]:
         """Returns the set of domain labels this internship belongs to."""
-        text = ((internship.title or '') + ' ' + (internship.description or '')).lower()
-        matched: set[str] = set()
-        for domain, keywords in DOMAIN_CLUSTERS.items():
-            if any(kw in text for kw in keywords):
-                matched.add(domain)
-        return matched
+        text = (internship.title or '') + ' ' + (internship.description or '')
+        return _DOMAIN_MATCHER.groups(text)
+
+    @staticmethod
+    def _domain_bitmask(domains: set[str]) -> int:
+        """Packs a set of domain labels into a DOMAIN_BITS bitmask."""
+        mask = 0
+        for domain in domains:
+            mask |= DOMAIN_BITS[domain]
+        return mask
+
+    def _title_codes_for(
+            self,
+            internships: list[models.Internship],
+            code_of: Optional[dict[str, int]] = None,
+            ) -> np.ndarray:
+        """Codes of the internships' lower-cased titles in _unique_titles."""
+        return _encode_values(
+            self._unique_titles, [(i.title or '').lower() for i in internships], code_of
+            ).astype(np.intp)
+
+    def _extend_title_index(self, internships: list[models.Internship]):
+        """
+        Appends internships to the title index. Only the titles of the
+        added rows are scanned; their entries are appended to every
+        memoised keyword mask, so the cost follows the update, not the
+        corpus.
+        """
+        codes = self._title_codes_for(internships)
+        self._title_codes = np.concatenate([self._title_codes, codes])
+        new_codes, rows = np.unique(codes, return_inverse=True)
+        titles = [self._unique_titles[code] for code in new_codes]
+        title_keywords = [_ROLE_MATCHER.keywords(t) for t in titles]
+        masks = {}
+        for keyword, mask in self._title_keyword_masks.items():
+            if keyword in _ROLE_KEYWORD_SET:
+                found = (keyword in kws for kws in title_keywords)
+            else:
+                found = (contains_keyword(t, keyword) for t in titles)
+            hits = np.fromiter(found, dtype=bool, count=len(titles))
+            masks[keyword] = np.concatenate([mask, hits[rows]])
+        self._title_keyword_masks = masks
+
+    def _prune_title_index(self):
+        """
+        Drops titles no indexed row uses any more, once they make up a
+        quarter of the table, so removals do not leave it growing.
+        """
+        used = np.unique(self._title_codes)
+        if len(self._unique_titles) - len(used) <= len(self._unique_titles) // 4:
+            return
+        remap = np.zeros(len(self._unique_titles), dtype=np.intp)
+        remap[used] = np.arange(len(used))
+        self._title_codes = remap[self._title_codes]
+        self._unique_titles = [self._unique_titles[code] for code in used]
+
+    def _warm_title_keyword_masks(self):
+        """
+        Rebuilds the memo with every keyword the title boost can expand
+        to, scanning each distinct title once for all of them.
+        """
+        self._title_keyword_masks = {}
+        title_keywords = [_ROLE_MATCHER.keywords(t) for t in self._unique_titles]
+        for keyword in _ROLE_KEYWORDS:
+            hits = np.fromiter(
+                (keyword in found for found in title_keywords),
+                dtype=bool,
+                count=len(title_keywords),
+                )
+            self._title_keyword_masks[keyword] = hits[self._title_codes]
+
+    def _title_keyword_mask(self, keyword: str) -> np.ndarray:
+        """
+        Boolean mask over internships whose title contains `keyword` as a
+        whole word. Memoised per keyword until the next fit.
+        """
+        mask = self._title_keyword_masks.get(keyword)
+        if mask is None:
+            hits = np.fromiter(
+                (contains_keyword(title, keyword) for title in self._unique_titles),
+                dtype=bool,
+                count=len(self._unique_titles),
+                )
+            mask = hits[self._title_codes]
+            if len(self._title_keyword_masks) >= _MAX_TITLE_KEYWORD_MASKS:
+                self._title_keyword_masks.clear()
+            self._title_keyword_masks[keyword] = mask
+        return mask
+
+    def _reason_rows(
+            self, internships: list[models.Internship]
+            ) -> sparse.csr_matrix:
+        """
+        Reason-index rows for the given internships. New tokens are added
+        to _reason_vocabulary; existing rows are widened to match.
+        """
+        assign = self._reason_vocabulary.setdefault
+        indices: list[int] = []
+        indptr = [0]
+        for internship in internships:
+            text = (internship.title or '') + ' ' + (internship.description or '')
+            indices.extend(sorted({
+                assign(t, len(self._reason_vocabulary))
+                for t in _reason_tokens(text)
+            }))
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (
+                np.ones(len(indices), dtype=bool),
+                np.asarray(indices, dtype=np.int32),
+                np.asarray(indptr, dtype=np.int64),
+            ),
+            shape=(len(internships), len(self._reason_vocabulary)),
+            )
+
+    def _widened_reason_index(self) -> sparse.csr_matrix:
+        """The reason index reshaped to the current vocabulary size."""
+        return self._widened(self._reason_index, len(self._reason_vocabulary))
+
+    def _reason_terms(self, text: str) -> Optional[tuple[int, ...]]:
+        """
+        Reason-token ids of a phrase, or None if it is empty or contains a
+        token no indexed internship has (so it cannot match any).
+        """
+        ids = []
+        for token in _reason_tokens(text):
+            token_id = self._reason_vocabulary.get(token)
+            if token_id is None:
+                return None
+            ids.append(token_id)
+        return tuple(ids) or None
+
+    def _reason_query(self, student: models.Student) -> dict:
+        """
+        Everything _generate_match_reason() looks for, resolved to token
+        ids once per student rather than once per recommended internship.
+        """
+        keywords_raw = getattr(student, "search_keywords", None) or ''
+        # keywords may be comma-separated or space-separated; deduplicate
+        seen: set[str] = set()
+        keywords: list[tuple[str, Optional[tuple[int, ...]]]] = []
+        for kw in keywords_raw.replace(',', ' ').split():
+            if kw.lower() not in seen:
+                seen.add(kw.lower())
+                keywords.append((kw, self._reason_terms(kw)))
+
+        return {
+            "role": [
+                self._reason_terms(kw)
+                for kw in self._expanded_role_keywords(student)
+            ],
+            "skills": [(s.name, self._reason_terms(s.name)) for s in student.skills],
+            "keywords": keywords,
+            "projects": [
+                (
+                    project.title,
+                    [
+                        self._reason_terms(t)
+                        for t in (project.technologies_used or '').split(',')
+                    ],
+                    self._reason_terms(project.title or ''),
+                )
+                for project in student.projects
+            ],
+        }
 
     def _generate_match_reason(
-            self, student: models.Student, internship: models.Internship
+            self,
+            student: models.Student,
+            row: int,
+            query: Optional[dict] = None,
             ) -> str:
         """
-        Produces a human-readable explanation for why this internship was
-        recommended to this student.
+        Produces a human-readable explanation for why the internship at
+        matrix position `row` was recommended to this student. A phrase
+        matches when all its tokens occur in the internship's title or
+        description. Pass a precomputed `query` when explaining several
+        internships for the same student.
         """
+        if query is None:
+            query = self._reason_query(student)
+        index = self._reason_index
+        terms = set(index.indices[index.indptr[row]:index.indptr[row + 1]].tolist())
+
+        def matches(phrase: Optional[tuple[int, ...]]) -> bool:
+            return phrase is not None and all(t in terms for t in phrase)
+
         reasons: list[str] = []
-        intern_text = (
-            (internship.title or '') + ' ' + (internship.description or '')
-        ).lower()
 
         # 1. Role / title alignment
-        if student.preferred_job_role:
-            role_words = student.preferred_job_role.lower().split()
-            expanded: set[str] = set(role_words)
-            for word in role_words:
-                expanded.update(ROLE_SYNONYMS.get(word, []))
-            if any(kw in intern_text for kw in expanded):
-                reasons.append(
-                    f"Aligns with your preferred role \"{student.preferred_job_role}\""
-                )
+        if any(matches(kw) for kw in query["role"]):
+            reasons.append(
+                f"Aligns with your preferred role \"{student.preferred_job_role}\""
+            )
 
         # 2. Matching skills
-        matching_skills = [
-            s.name for s in student.skills if s.name.lower() in intern_text
-        ]
+        matching_skills = [name for name, phrase in query["skills"] if matches(phrase)]
         if matching_skills:
             reasons.append(
                 f"Your skills match: {', '.join(matching_skills[:5])}"
             )
 
         # 3. Keywords that fired
-        keywords_raw = getattr(student, "search_keywords", None)
-        if keywords_raw:
-            # keywords may be comma-separated or space-separated
-            kws = [k.strip() for k in keywords_raw.replace(',', ' ').split() if k.strip()]
-            matching_kws = [kw for kw in kws if kw.lower() in intern_text]
-            # Deduplicate and limit
-            seen: set[str] = set()
-            unique_kws: list[str] = []
-            for kw in matching_kws:
-                if kw.lower() not in seen:
-                    seen.add(kw.lower())
-                    unique_kws.append(kw)
-            if unique_kws:
-                reasons.append(f"Keyword match: {', '.join(unique_kws[:4])}")
+        matching_kws = [kw for kw, phrase in query["keywords"] if matches(phrase)]
+        if matching_kws:
+            reasons.append(f"Keyword match: {', '.join(matching_kws[:4])}")
 
         # 4. Projects that reference the same technologies
-        matching_projects: list[str] = []
-        for project in student.projects:
-            tech = (project.technologies_used or '').lower()
-            title = (project.title or '').lower()
-            if tech and any(t.strip() in intern_text for t in tech.split(',')):
-                matching_projects.append(project.title)
-            elif title and title in intern_text:
-                matching_projects.append(project.title)
+        matching_projects = [
+            title for title, techs, title_phrase in query["projects"]
+            if any(matches(t) for t in techs) or matches(title_phrase)
+        ]
         if matching_projects:
             reasons.append(
                 f"Related to your project(s): {', '.join(matching_projects[:2])}"
@@ -225,42 +798,314 @@ class TFIDFRecommender:
 
         return " · ".join(reasons)
 
+    def explain(
+            self, student: models.Student, internship_id: int
+            ) -> Optional[str]:
+        """
+        Match reason for one internship, or None if it is not indexed.
+        Lets clients skip reasons in bulk responses and fetch them on
+        demand.
+        """
+        rows = np.flatnonzero(self.internship_ids == internship_id)
+        if not len(rows):
+            return None
+        return self._generate_match_reason(student, int(rows[0]))
+
+    def _extend_filter_columns(self, internships: list[models.Internship]):
+        """Appends the internships' location, source and created_at."""
+        self._location_codes = np.concatenate([
+            self._location_codes,
+            _encode_values(
+                self._locations, [_normalize_value(i.location) for i in internships]
+            ),
+        ])
+        self._source_codes = np.concatenate([
+            self._source_codes,
+            _encode_values(
+                self._sources,
+                [_normalize_value(getattr(i, 'source', None)) for i in internships],
+            ),
+        ])
+        self.internship_created_at = np.concatenate([
+            self.internship_created_at,
+            np.fromiter(
+                (
+                    int(i.created_at.timestamp()) if i.created_at else 0
+                    for i in internships
+                ),
+                dtype=np.int64,
+                count=len(internships),
+            ),
+        ])
+
+    def filter_mask(
+            self,
+            location: Optional[str] = None,
+            source: Optional[str] = None,
+            posted_after: Optional[float] = None,
+            ) -> Optional[np.ndarray]:
+        """
+        Boolean mask over the matrix rows that pass every given filter, or
+        None if none is set:
+
+        - location: whole-word match in the posting's location, so
+          "sydney" matches "Sydney NSW 2000"
+        - source: case-insensitive exact match, e.g. "LinkedIn"
+        - posted_after: created_at at or after this epoch time
+
+        Location and source are tested once per distinct value and spread
+        to the rows through their codes.
+        """
+        mask = None
+        if location:
+            hits = np.fromiter(
+                (contains_keyword(value, location) for value in self._locations),
+                dtype=bool,
+                count=len(self._locations),
+                )
+            mask = hits[self._location_codes]
+        if source:
+            wanted = _normalize_value(source)
+            hits = np.array([value == wanted for value in self._sources], dtype=bool)
+            matches = hits[self._source_codes]
+            mask = matches if mask is None else mask & matches
+        if posted_after is not None:
+            recent = self.internship_created_at >= posted_after
+            mask = recent if mask is None else mask & recent
+        return mask
+
     def fit(self, internships: list[models.Internship]):
         """
         Fits the TF-IDF vectorizer on the entire corpus of internships.
+        The rows themselves are not kept (see row_loader).
         """
-        self.internships = internships
-        internship_docs = [
-            self._compile_internship_document(i) for i in internships
-            ]
-        # Ensure we have data to fit
-        if internship_docs:
-            self.internship_matrix = self.vectorizer.fit_transform(internship_docs)
-            print(f"TF-IDF model fitted on {len(internships)} internships.")
+        self.fit_batches([internships])
+
+    def fit_batches(self, batches: Iterable[list[models.Internship]]):
+        """
+        Fits on a corpus delivered in batches, e.g. from
+        crud.iter_internship_batches(). Each batch is reduced to its index
+        arrays and weighted term counts before the next is read, so only
+        one batch of rows is in memory at a time.
+        """
+        self.vectorizer = self._new_vectorizer()
+        self._analyzer = None
+        vocabulary: dict[str, int] = {}
+        self._unique_titles = []
+        self._reason_vocabulary = {}
+        self._locations = []
+        self._sources = []
+        self._location_codes = np.zeros(0, dtype=np.int32)
+        self._source_codes = np.zeros(0, dtype=np.int32)
+        self.internship_created_at = np.zeros(0, dtype=np.int64)
+
+        # Domain labels and title matches depend only on the corpus, so
+        # they are computed here once instead of on every recommend().
+        ids, domain_masks, title_codes, reason_blocks, count_blocks = [], [], [], [], []
+        title_code_of: dict[str, int] = {}
+        for batch in batches:
+            if not len(batch):
+                continue
+            ids.append(self._id_array(batch))
+            domain_masks.append(self._domain_mask_array(batch))
+            title_codes.append(self._title_codes_for(batch, title_code_of))
+            reason_blocks.append(self._reason_rows(batch))
+            self._extend_filter_columns(batch)
+            count_blocks.append(self._weighted_counts(
+                [self._internship_fields(i) for i in batch], vocabulary, grow=True
+                ))
+
+        self.internship_ids = np.concatenate(ids or [np.zeros(0, dtype=np.int64)])
+        self.internship_domain_masks = np.concatenate(
+            domain_masks or [np.zeros(0, dtype=np.uint16)]
+            )
+        self._title_codes = np.concatenate(title_codes or [np.zeros(0, dtype=np.intp)])
+        self._warm_title_keyword_masks()
+        # Blocks were built against a growing vocabulary; widen them all to
+        # its final size before stacking.
+        width = len(self._reason_vocabulary)
+        self._reason_index = (
+            sparse.vstack([self._widened(b, width) for b in reason_blocks], format='csr')
+            if reason_blocks else sparse.csr_matrix((0, width), dtype=bool)
+            )
+        total = len(self.internship_ids)
+        self._fitted_size = total
+        self._incremental_changes = 0
+        # Ensure we have data to fit. A fresh vectorizer is fitted so that
+        # copies of this model sharing the old one are left untouched.
+        if total:
+            counts = sparse.vstack(
+                [self._widened(b, len(vocabulary)) for b in count_blocks], format='csr'
+                )
+            del count_blocks
+            self.internship_matrix = self._compact(self._fit_vectorizer(counts, vocabulary))
+            self.vocabulary_version = self._vocabulary_fingerprint()
+            print(f"TF-IDF model fitted on {total} internships.")
         else:
+            self.internship_matrix = None
+            self.vocabulary_version = ""
             print("Warning: No internships found to train model.")
 
-    def recommend(
-            self, student: models.Student,
-            top_n: int = 10
-            ) -> list[tuple[models.Internship, str]]:
+    def _vocabulary_fingerprint(self) -> str:
+        """Digest of the fitted vocabulary and IDF weights."""
+        digest = hashlib.sha1()
+        digest.update('\x1f'.join(self.vectorizer.get_feature_names_out()).encode('utf-8'))
+        digest.update(np.ascontiguousarray(self.vectorizer.idf_).tobytes())
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def _id_array(internships: list[models.Internship]) -> np.ndarray:
+        return np.fromiter(
+            (i.id for i in internships), dtype=np.int64, count=len(internships)
+            )
+
+    def _domain_mask_array(
+            self, internships: list[models.Internship]
+            ) -> np.ndarray:
+        return np.fromiter(
+            (
+                self._domain_bitmask(self._get_internship_domain(i))
+                for i in internships
+            ),
+            dtype=np.uint16,
+            count=len(internships),
+            )
+
+    def _rows_by_index(self, indices) -> dict[int, models.Internship]:
         """
-        Recommends the top N internships for a given student.
+        Maps matrix positions to internship rows, from row_cache or else
+        row_loader. Rows that can no longer be loaded (deleted since the
+        last fit) are left out.
         """
+        indices = [int(i) for i in indices]
+        ids = self.internship_ids[indices].tolist() if indices else []
+        if not ids:
+            return {}
+        by_id = self.row_cache.get_many(ids)
+        missing = [id_ for id_ in ids if id_ not in by_id]
+        if missing and self.row_loader is not None:
+            loaded = self.row_loader(missing)
+            self.row_cache.set_many(loaded)
+            by_id.update((row.id, row) for row in loaded)
+        return {i: by_id[id_] for i, id_ in zip(indices, ids) if id_ in by_id}
+
+    def _needs_refit(self, pending: int = 0) -> bool:
+        """
+        Whether `pending` more incremental changes would take the index past
+        its drift limit, so the caller should build a full fit instead.
+        """
+        changes = self._incremental_changes + pending
+        return changes > self.refit_drift * max(self._fitted_size, 1)
+
+    def add_internships(self, internships: list[models.Internship]) -> int:
+        """
+        Appends internships to the index without refitting the vectorizer.
+
+        New rows are transformed with the existing vocabulary and IDF
+        weights, so terms first seen in these postings are ignored until
+        the next full fit. Internships whose id is already indexed are
+        replaced. Never refits on its own: callers check _needs_refit()
+        first. Returns the number of rows added.
+        """
+        if not internships:
+            return 0
         if self.internship_matrix is None:
-            return []
+            self.fit(internships)
+            return len(internships)
+
+        self.remove_internships([i.id for i in internships])
+        self.row_cache.discard([i.id for i in internships])
+
+        self._incremental_changes += len(internships)
+        new_rows = self._compact(self._tfidf(self._weighted_counts(
+            [self._internship_fields(i) for i in internships],
+            self.vectorizer.vocabulary_,
+            )))
+        self.internship_matrix = sparse.vstack(
+            [self.internship_matrix, new_rows], format='csr'
+            )
+        self.internship_ids = np.concatenate(
+            [self.internship_ids, self._id_array(internships)]
+            )
+        self.internship_domain_masks = np.concatenate(
+            [self.internship_domain_masks, self._domain_mask_array(internships)]
+            )
+        self._extend_title_index(internships)
+        new_reason_rows = self._reason_rows(internships)
+        self._reason_index = sparse.vstack(
+            [self._widened_reason_index(), new_reason_rows], format='csr'
+            )
+        self._extend_filter_columns(internships)
+        print(f"TF-IDF index extended with {len(internships)} internships.")
+        return len(internships)
+
+    def remove_internships(self, internship_ids: list[int]) -> int:
+        """
+        Drops internships from the index by id. Rows are L2-normalised
+        individually, so the remaining rows need no rescaling. Returns the
+        number of rows removed.
+        """
+        if self.internship_matrix is None or not len(internship_ids):
+            return 0
+        keep = ~np.isin(self.internship_ids, np.asarray(internship_ids, dtype=np.int64))
+        removed = int(len(keep) - keep.sum())
+        if not removed:
+            return 0
+
+        self.internship_matrix = self.internship_matrix[keep]
+        self.internship_ids = self.internship_ids[keep]
+        self.internship_domain_masks = self.internship_domain_masks[keep]
+        self._title_codes = self._title_codes[keep]
+        self._title_keyword_masks = {
+            kw: mask[keep] for kw, mask in self._title_keyword_masks.items()
+            }
+        self._prune_title_index()
+        self._reason_index = self._reason_index[keep]
+        self._location_codes = self._location_codes[keep]
+        self._source_codes = self._source_codes[keep]
+        self.internship_created_at = self.internship_created_at[keep]
+
+        self._incremental_changes += removed
+        return removed
 
-        # 1. Create the student's document
-        student_doc = self._compile_student_document(student)
+    # Students scored per sparse product in recommend_many(); bounds the
+    # dense students × internships score block held in memory at once.
+    BATCH_CHUNK_SIZE = 64
+
+    def _expanded_role_keywords(self, student: models.Student) -> set[str]:
+        """Role words plus their ROLE_SYNONYMS, used for the title boost."""
+        if not student.preferred_job_role:
+            return set()
+        role_words = student.preferred_job_role.lower().split()
+        expanded_keywords: set[str] = set(role_words)
+        for word in role_words:
+            expanded_keywords.update(ROLE_SYNONYMS.get(word, []))
+        return expanded_keywords
+
+    def _similarity(self, student_vectors: sparse.csr_matrix) -> np.ndarray:
+        """
+        Cosine similarity of student TF-IDF vectors with every internship.
+        Both sides are already L2-normalised by the vectorizer, so a plain
+        dot product suffices and avoids copying the (possibly
+        memory-mapped) internship matrix. Student vectors are cast to the
+        matrix's dtype, so a float32 matrix is not upcast per request.
+        """
+        return linear_kernel(
+            student_vectors.astype(self.internship_matrix.dtype, copy=False),
+            self.internship_matrix,
+            )
 
-        # 2. Transform the student doc into a TF-IDF vector
-        student_vector = self.vectorizer.transform([student_doc])
+    def _score(self, students: list[models.Student]) -> np.ndarray:
+        """
+        Adjusted students × internships score matrix: cosine similarity
+        with the domain penalty and title boost applied row-wise.
+        """
+        # 1-2. Student TF-IDF vectors, reused for unchanged profiles
+        student_vectors, student_masks = self._student_vectors(students)
 
-        # 3. Compute cosine similarity
-        cosine_similarities = cosine_similarity(
-            student_vector,
-            self.internship_matrix
-            ).flatten()
+        # 3. Similarity between the students and every internship
+        with stage("similarity"):
+            scores = self._similarity(student_vectors)
 
         # -------------------------------------------------------------
         # 4. DOMAIN PENALTY: hard-penalise clearly off-domain results
@@ -268,57 +1113,272 @@ class TFIDFRecommender:
         # If the student is in the tech domain, internships whose title +
         # description belong exclusively to a non-tech domain get a ×0.05
         # penalty — effectively removing them from contention.
-        student_domains = self._get_student_domain(student)
-        for idx, internship in enumerate(self.internships):
-            intern_domains = self._get_internship_domain(internship)
-            if not intern_domains:
-                # Unknown domain — leave score unchanged
-                continue
-            if student_domains and not student_domains.intersection(intern_domains):
-                # Internship is in a completely different domain
-                cosine_similarities[idx] *= 0.05
+        # Students with no detectable domain (mask 0) and unknown-domain
+        # internships (mask 0) keep their scores.
+        with stage("domain_penalty"):
+            intern_masks = self.internship_domain_masks
+            off_domain = (
+                (student_masks[:, None] != 0)
+                & (intern_masks[None, :] != 0)
+                & ((student_masks[:, None] & intern_masks[None, :]) == 0)
+            )
+            scores[off_domain] *= 0.05
 
         # -------------------------------------------------------------
         # 5. TITLE BOOST: reward internships whose title matches the role
         # -------------------------------------------------------------
         # Boost ×2.5 (up from ×1.5) and also accept domain synonyms so
         # "Software Engineer Intern" is boosted for a "Frontend Developer".
-        if student.preferred_job_role:
-            role_words = student.preferred_job_role.lower().split()
-            # Build expanded keyword set using ROLE_SYNONYMS
-            expanded_keywords: set[str] = set(role_words)
-            for word in role_words:
-                expanded_keywords.update(ROLE_SYNONYMS.get(word, []))
+        with stage("title_boost"):
+            boosted = np.zeros(scores.shape, dtype=bool)
+            for row, student in enumerate(students):
+                for kw in self._expanded_role_keywords(student):
+                    boosted[row] |= self._title_keyword_mask(kw)
+            scores[boosted] *= 2.5
 
-            for idx, internship in enumerate(self.internships):
-                title_lower = internship.title.lower()
-                if any(kw in title_lower for kw in expanded_keywords):
-                    cosine_similarities[idx] *= 2.5
+        return scores
 
-        # -------------------------------------------------------------
+    @staticmethod
+    def _top_indices(
+            scores: np.ndarray,
+            top_n: int,
+            mask: Optional[np.ndarray] = None,
+            ) -> np.ndarray:
+        """
+        Row-wise indices of the top_n scores, best first. Equal scores keep
+        their argpartition order. Columns outside `mask` (see
+        filter_mask()) are excluded before partitioning, so a filtered
+        query costs the same as an unfiltered one.
+        """
+        actual_top_n = min(top_n, scores.shape[1])
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+            actual_top_n = min(actual_top_n, int(np.count_nonzero(mask)))
+        if actual_top_n == 0:
+            return np.zeros((scores.shape[0], 0), dtype=np.intp)
 
-        # 6. Get the indices of the top N most similar internships
-        actual_top_n = min(top_n, len(self.internships))
+        # Argpartition to get top N unsorted
+        related = np.argpartition(scores, -actual_top_n, axis=1)[:, -actual_top_n:]
 
-        if actual_top_n == 0:
+        # Sort these top N indices by their similarity score
+        order = np.argsort(
+            -np.take_along_axis(scores, related, axis=1), axis=1, kind='stable'
+            )
+        return np.take_along_axis(related, order, axis=1)
+
+    def _results(
+            self,
+            student: models.Student,
+            top: np.ndarray,
+            by_index: dict[int, models.Internship],
+            with_reasons: bool,
+            ) -> list[tuple[models.Internship, Optional[str]]]:
+        """Pairs the rows at `top` with their match reasons (or None)."""
+        if not with_reasons:
+            return [(by_index[i], None) for i in top.tolist() if i in by_index]
+        with stage("reasons"):
+            query = self._reason_query(student)
+            return [
+                (by_index[i], self._generate_match_reason(student, i, query))
+                for i in top.tolist() if i in by_index
+            ]
+
+    def rank(
+            self,
+            student: models.Student,
+            top_k: int = 500,
+            mask: Optional[np.ndarray] = None,
+            ) -> list[tuple[int, float]]:
+        """
+        The student's top_k (internship_id, score) pairs, best first,
+        restricted to `mask` if given. Kept by the service so further
+        pages are sliced from it rather than rescored.
+        """
+        if self.internship_matrix is None:
             return []
+        scores = self._score([student])
+        with stage("top_k"):
+            top = self._top_indices(scores, top_k, mask)[0]
+        return list(zip(self.internship_ids[top].tolist(), scores[0, top].tolist()))
 
-        # Argpartition to get top N unsorted
-        related_docs_indices = np.argpartition(
-            cosine_similarities, -actual_top_n
-            )[-actual_top_n:]
-
-        # 7. Sort these top N indices by their similarity score
-        top_indices = sorted(
-            related_docs_indices,
-            key=lambda i: cosine_similarities[i],
-            reverse=True
+    def results_for(
+            self,
+            student: models.Student,
+            internship_ids: list[int],
+            with_reasons: bool = True,
+            ) -> list[tuple[models.Internship, Optional[str]]]:
+        """
+        Rows and match reasons for internships from an earlier rank(), in
+        the given order. Ids no longer indexed are skipped.
+        """
+        ids = np.asarray(internship_ids, dtype=np.int64)
+        positions = np.flatnonzero(np.isin(self.internship_ids, ids))
+        position_of = dict(zip(self.internship_ids[positions].tolist(), positions.tolist()))
+        top = np.asarray(
+            [position_of[i] for i in internship_ids if i in position_of], dtype=np.intp
             )
+        with stage("load_rows"):
+            by_index = self._rows_by_index(top)
+        return self._results(student, top, by_index, with_reasons)
 
-        # 8. Return internship objects paired with their match reasons
-        recommended_internships = [
-            (self.internships[i], self._generate_match_reason(student, self.internships[i]))
-            for i in top_indices
+    def recommend_many(
+            self, students: list[models.Student],
+            top_n: int = 10,
+            with_reasons: bool = True,
+            mask: Optional[np.ndarray] = None,
+            ) -> list[list[tuple[models.Internship, Optional[str]]]]:
+        """
+        Recommends the top N internships for each of several students,
+        scoring them together in one sparse product per chunk. Returns one
+        result list per student, in input order. With `with_reasons` off,
+        reasons are None (see explain()). `mask` restricts results as in
+        filter_mask().
+        """
+        if self.internship_matrix is None or not students:
+            return [[] for _ in students]
+
+        top_rows: list[np.ndarray] = []
+        for start in range(0, len(students), self.BATCH_CHUNK_SIZE):
+            chunk = students[start:start + self.BATCH_CHUNK_SIZE]
+            scores = self._score(chunk)
+            with stage("top_k"):
+                top_rows.extend(self._top_indices(scores, top_n, mask))
+
+        # Load each distinct internship once for the whole batch
+        with stage("load_rows"):
+            by_index = self._rows_by_index(np.unique(np.concatenate(top_rows)))
+
+        return [
+            self._results(student, top, by_index, with_reasons)
+            for student, top in zip(students, top_rows)
         ]
+
+    def recommend(
+            self, student: models.Student,
+            top_n: int = 10,
+            with_reasons: bool = True,
+            mask: Optional[np.ndarray] = None,
+            ) -> list[tuple[models.Internship, Optional[str]]]:
+        """
+        Recommends the top N internships for a given student, optionally
+        restricted to the rows in `mask` (see filter_mask()).
+        """
+        if self.internship_matrix is None:
+            return []
+
+        # Steps 1-5: score, penalise off-domain, boost matching titles
+        scores = self._score([student])
+
+        # 6-7. Get the indices of the top N most similar internships
+        with stage("top_k"):
+            top_indices = self._top_indices(scores, top_n, mask)[0]
+
+        # 8. Return internship objects paired with their match reasons
+        with stage("load_rows"):
+            by_index = self._rows_by_index(top_indices)
+        recommended_internships = self._results(
+            student, top_indices, by_index, with_reasons
+            )
         print("Recommended Internships IDs:", [t[0].id for t in recommended_internships])
         return recommended_internships
+
+
+class LSARecommender(TFIDFRecommender):
+    """
+    TF-IDF recommender that scores in a dense latent space (LSA).
+
+    After the TF-IDF fit, a truncated SVD projects the matrix to a few
+    hundred dimensions. Terms that co-occur across postings share
+    directions there, so matching depends less on the hand-made
+    ROLE_SYNONYMS. Scoring is one contiguous float32 matmul, whose cost
+    does not depend on how many terms a posting has. Latent cosines can
+    be negative, so they are clipped at 0: the domain penalty and title
+    boost multiply scores and would otherwise invert on those rows.
+    Filters and match reasons are unchanged.
+
+    Internships added incrementally are folded in with the existing
+    projection, like their TF-IDF rows reuse the existing vocabulary.
+    """
+
+    ENGINE = "lsa"
+
+    def __init__(self, dimensions: int = 256, **kwargs):
+        super().__init__(**kwargs)
+        self.dimensions = dimensions
+        # (dimensions × vocabulary) projection and (rows × dimensions)
+        # unit-length internship embeddings; None until fitted, or if the
+        # corpus is too small to project.
+        self.lsa_components: Optional[np.ndarray] = None
+        self.internship_embeddings: Optional[np.ndarray] = None
+
+    def variant(self) -> str:
+        """
+        Like TFIDFRecommender.variant(), with the configured dimensions in
+        the engine part, e.g. "lsa256:float32": the projection size
+        changes every score, so a snapshot of another size is not reused.
+        """
+        parts = super().variant().split(":")
+        parts[0] = f"{self.ENGINE}{self.dimensions}"
+        return ":".join(parts)
+
+    def _project(self, vectors: sparse.csr_matrix) -> np.ndarray:
+        """Unit-length float32 embeddings of TF-IDF rows."""
+        dense = np.asarray(vectors @ self.lsa_components.T, dtype=np.float32)
+        return normalize(dense, norm='l2', copy=False)
+
+    def _fit_projection(self):
+        self.lsa_components = None
+        self.internship_embeddings = None
+        if self.internship_matrix is None:
+            return
+        rows, terms = self.internship_matrix.shape
+        dimensions = min(self.dimensions, terms - 1, rows - 1)
+        if dimensions < 1:
+            return
+        svd = TruncatedSVD(n_components=dimensions, random_state=0)
+        svd.fit(self.internship_matrix)
+        self.lsa_components = np.ascontiguousarray(svd.components_, dtype=np.float32)
+        self.internship_embeddings = np.ascontiguousarray(
+            self._project(self.internship_matrix)
+            )
+        print(f"LSA projection fitted with {dimensions} dimensions.")
+
+    def fit_batches(self, batches: Iterable[list[models.Internship]]):
+        super().fit_batches(batches)
+        self._fit_projection()
+
+    def add_internships(self, internships: list[models.Internship]) -> int:
+        added = super().add_internships(internships)
+        embeddings = self.internship_embeddings
+        # Unless this was the first fit, the new rows were appended to the
+        # matrix.
+        if embeddings is not None and len(embeddings) < self.internship_matrix.shape[0]:
+            tail = self.internship_matrix[len(embeddings):]
+            self.internship_embeddings = np.vstack([embeddings, self._project(tail)])
+        return added
+
+    def remove_internships(self, internship_ids: list[int]) -> int:
+        keep = ~np.isin(self.internship_ids, np.asarray(internship_ids, dtype=np.int64))
+        removed = super().remove_internships(internship_ids)
+        if removed and self.internship_embeddings is not None:
+            self.internship_embeddings = self.internship_embeddings[keep]
+        return removed
+
+    def _similarity(self, student_vectors: sparse.csr_matrix) -> np.ndarray:
+        if self.internship_embeddings is None:
+            return super()._similarity(student_vectors)
+        scores = self._project(student_vectors) @ self.internship_embeddings.T
+        # Like the TF-IDF cosines, keep scores non-negative so the
+        # multiplicative domain penalty and title boost stay monotone.
+        return np.maximum(scores, 0, out=scores)
+
+
+def create_recommender(
+        engine: str = "tfidf", lsa_dimensions: int = 256, **kwargs
+        ) -> TFIDFRecommender:
+    """New, unfitted recommender for the named engine ("tfidf" or "lsa")."""
+    if engine == LSARecommender.ENGINE:
+        return LSARecommender(dimensions=lsa_dimensions, **kwargs)
+    if engine == TFIDFRecommender.ENGINE:
+        return TFIDFRecommender(**kwargs)
+    raise ValueError(f"Unknown recommender engine: {engine!r}")
@@ -1,4 +1,7 @@
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime
+from typing import Iterator, Optional
+from sqlalchemy import Row, func, select
+from sqlalchemy.orm import Session, joinedload, selectinload
 from shared.core import models  # Assuming shared models are accessible
 
 
@@ -17,8 +20,178 @@ def get_student_profile(db: Session, student_id: int) -> models.Student | None:
     ).first()
 
 
-def get_all_internships(db: Session) -> list[models.Internship]:
+def get_profile_version(db: Session, student_id: int) -> int | None:
     """
-    Fetches all internships from the database.
+    Fetches only the student's profile_version, or None if the student
+    does not exist. Cheap enough to run on every request.
     """
-    return db.query(models.Internship).all()
+    row = db.query(models.Student.profile_version).filter(
+        models.Student.id == student_id
+        ).first()
+    return row[0] if row else None
+
+
+def get_student_profiles(
+        db: Session, student_ids: list[int]
+        ) -> list[models.Student]:
+    """
+    Fetches several students with the collections the recommender scores
+    (skills and projects). Each collection is loaded with its own IN query,
+    so a batch costs three queries instead of one join whose rows multiply
+    per student.
+    """
+    if not student_ids:
+        return []
+    return db.query(models.Student).filter(
+        models.Student.id.in_(student_ids)
+        ).options(
+        selectinload(models.Student.skills),
+        selectinload(models.Student.projects),
+    ).all()
+
+
+def _canonical():
+    """
+    Postings the recommender indexes: the crawler marks near-duplicates
+    (the same job on LinkedIn and Seek, recrawls under a new URL) with
+    duplicate_of, and only each cluster's canonical posting is scored.
+    """
+    return models.Internship.duplicate_of.is_(None)
+
+
+# Columns the recommender indexes; everything else (url, timestamps other
+# than created_at) is only needed for the few rows a response returns.
+_INDEXED_INTERNSHIP_COLUMNS = (
+    models.Internship.id,
+    models.Internship.title,
+    models.Internship.company,
+    models.Internship.description,
+    models.Internship.location,
+    models.Internship.source,
+    models.Internship.created_at,
+)
+
+
+def iter_internship_batches(
+        db: Session, batch_size: int = 2000
+        ) -> Iterator[list[Row]]:
+    """
+    Streams the indexed columns of every canonical internship (see
+    _canonical) in batches of
+    `batch_size` rows, for TFIDFRecommender.fit_batches(). Uses a
+    server-side cursor where the driver supports one (psycopg2 does), so
+    neither the driver nor the ORM holds the whole table at once. Rows
+    are plain tuples with attribute access, not Internship instances.
+    """
+    result = db.execute(
+        select(*_INDEXED_INTERNSHIP_COLUMNS)
+        .where(_canonical())
+        .order_by(models.Internship.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for batch in result.partitions():
+        yield batch
+
+
+def get_internship_ids(db: Session) -> list[int]:
+    """
+    Fetches the ids of every canonical internship, used to diff the
+    database against the recommender's index without loading full rows.
+    A posting later marked as a duplicate drops out of the index this way.
+    """
+    return [
+        row[0] for row in db.query(models.Internship.id).filter(_canonical()).all()
+    ]
+
+
+def get_internships_by_ids(
+        db: Session, internship_ids: list[int]
+        ) -> list[models.Internship]:
+    """
+    Fetches the internships with the given ids.
+    """
+    if not internship_ids:
+        return []
+    return db.query(models.Internship).filter(
+        models.Internship.id.in_(internship_ids)
+        ).all()
+
+
+def get_internships_fingerprint(db: Session) -> str:
+    """
+    Cheap summary of the indexed internships (row count, max id, newest
+    created_at, and after an "@" the newest updated_at) used to tell
+    whether a saved model snapshot is stale. The updated_at part catches
+    postings the crawler rewrote in place; see fingerprint_updated_at().
+    """
+    count, max_id, max_created, max_updated = db.query(
+        func.count(models.Internship.id),
+        func.max(models.Internship.id),
+        func.max(models.Internship.created_at),
+        func.max(models.Internship.updated_at),
+        ).filter(_canonical()).one()
+    newest = max_created.isoformat() if max_created else ""
+    updated = max_updated.isoformat() if max_updated else ""
+    return f"{count}:{max_id or 0}:{newest}@{updated}"
+
+
+def fingerprint_updated_at(fingerprint: Optional[str]) -> Optional[datetime]:
+    """
+    The newest updated_at recorded in a fingerprint, or None if it has
+    none (an empty table, or a fingerprint from before updated_at).
+    """
+    if not fingerprint or "@" not in fingerprint:
+        return None
+    updated = fingerprint.rpartition("@")[2]
+    return datetime.fromisoformat(updated) if updated else None
+
+
+def get_internship_ids_updated_since(db: Session, since: datetime) -> list[int]:
+    """
+    Fetches the ids of canonical internships edited in place after `since`,
+    so an incremental update can re-index just those rows.
+    """
+    return [
+        row[0] for row in db.query(models.Internship.id).filter(
+            _canonical(), models.Internship.updated_at > since
+            ).all()
+    ]
+
+
+def get_all_student_ids(db: Session) -> list[int]:
+    """
+    Fetches the ids of every student, in id order.
+    """
+    return [
+        row[0] for row in
+        db.query(models.Student.id).order_by(models.Student.id).all()
+    ]
+
+
+def get_materialized_recommendations(
+        db: Session, student_id: int
+        ) -> list[models.StudentRecommendation]:
+    """
+    Fetches a student's precomputed recommendations, best first, with
+    their internships loaded in the same query.
+    """
+    return db.query(models.StudentRecommendation).filter(
+        models.StudentRecommendation.student_id == student_id
+        ).options(
+        joinedload(models.StudentRecommendation.internship)
+    ).order_by(models.StudentRecommendation.rank).all()
+
+
+def replace_materialized_recommendations(
+        db: Session, student_ids: list[int], rows: list[dict]
+        ):
+    """
+    Replaces the precomputed recommendations of the given students with
+    `rows` in a single transaction.
+    """
+    db.query(models.StudentRecommendation).filter(
+        models.StudentRecommendation.student_id.in_(student_ids)
+        ).delete(synchronize_session=False)
+    if rows:
+        db.bulk_insert_mappings(models.StudentRecommendation, rows)
+    db.commit()
@@ -1,91 +1,321 @@
 import os
-import time
+import asyncio
 import threading
-from fastapi import FastAPI
+import time
+from typing import Literal
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
 from contextlib import asynccontextmanager
 import traceback
 from shared.core.database import SessionLocal, engine
 from shared.core import models
-from . import crud, core, schemas
+from . import cache, crud, metrics, schemas, scheduler, workers
 from fastapi.middleware.cors import CORSMiddleware
 
 # This tells SQLAlchemy to create tables if they don't exist
 models.Base.metadata.create_all(bind=engine)
 
-# --- Global Recommender Instance ---
-recommender = core.TFIDFRecommender()
+# Additive migration shared with user_api, in case this service starts first.
+with engine.connect() as _conn:
+    _conn.execute(
+        __import__("sqlalchemy").text(
+            "ALTER TABLE students ADD COLUMN IF NOT EXISTS "
+            "profile_version INTEGER NOT NULL DEFAULT 0;"
+        )
+    )
+    # Shared with the crawler, which bumps updated_at when it rewrites a
+    # posting in place and clusters near-duplicate postings.
+    _conn.execute(
+        __import__("sqlalchemy").text(
+            "ALTER TABLE internships ADD COLUMN IF NOT EXISTS "
+            "updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;"
+        )
+    )
+    _conn.execute(
+        __import__("sqlalchemy").text(
+            "ALTER TABLE internships ADD COLUMN IF NOT EXISTS "
+            "duplicate_of INTEGER REFERENCES internships(id);"
+        )
+    )
+    _conn.execute(
+        __import__("sqlalchemy").text(
+            "ALTER TABLE internships ADD COLUMN IF NOT EXISTS minhash BYTEA;"
+        )
+    )
+    _conn.commit()
 
-# --- In-process recommendation cache ---
+# --- Published Recommender ---
+# The scheduler owns the live model and swaps in rebuilt ones atomically.
+# Fitted models are snapshotted to SNAPSHOT_DIR and memory-mapped on the
+# next boot. With several uvicorn workers sharing SNAPSHOT_DIR, one of them
+# (the leader) builds models and the rest map its snapshots read-only.
+SNAPSHOT_DIR = os.getenv(
+    "RECOMMENDER_SNAPSHOT_DIR", "/tmp/align_recommender_snapshot"
+)
+REFRESH_INTERVAL = float(os.getenv("RECOMMENDER_REFRESH_INTERVAL", "300"))
+# "tfidf" (sparse cosine, default) or "lsa" (dense latent-space scoring).
+ENGINE = os.getenv("RECOMMENDER_ENGINE", "tfidf")
+LSA_DIMENSIONS = int(os.getenv("RECOMMENDER_LSA_DIMENSIONS", "256"))
+# Internship matrix storage: "float32" halves the values; a non-zero
+# MAX_TERMS keeps only each posting's highest-weight terms.
+MATRIX_DTYPE = os.getenv("RECOMMENDER_MATRIX_DTYPE", "float64")
+MAX_TERMS = int(os.getenv("RECOMMENDER_MAX_TERMS", "0"))
+model_store = scheduler.ModelScheduler(
+    SessionLocal,
+    snapshot_dir=SNAPSHOT_DIR,
+    interval=REFRESH_INTERVAL,
+    engine=ENGINE,
+    lsa_dimensions=LSA_DIMENSIONS,
+    load_batch_size=int(os.getenv("RECOMMENDER_LOAD_BATCH_SIZE", "2000")),
+    matrix_dtype=MATRIX_DTYPE,
+    max_terms=MAX_TERMS,
+)
+
+# --- Recommendation cache ---
 # Keyed by student_id. Avoids repeated DB hits when Dashboard, JobsPage,
 # and notifications/check all fire concurrently on the same page load.
-_rec_cache: dict[int, dict] = {}
-_rec_cache_ts: dict[int, float] = {}
-_REC_CACHE_TTL = 120  # seconds
+# Entries are tagged with the model version and the student's
+# profile_version (bumped by user_api on every profile write), so they
+# stay valid until either changes; the TTL only reclaims entries of idle
+# students.
+#
+# The same backend holds "computation in flight" claims, so concurrent
+# requests for one student start a single computation. With several
+# uvicorn workers or replicas, pick a shared backend: "sqlite" (one host)
+# or "redis" (any Redis-protocol server) instead of the per-process
+# "memory" default.
+rec_cache = cache.create_cache(
+    backend=os.getenv("REC_CACHE_BACKEND", "memory"),
+    max_entries=int(os.getenv("REC_CACHE_MAX_ENTRIES", "10000")),
+    max_bytes=int(os.getenv("REC_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.getenv("REC_CACHE_TTL", str(24 * 60 * 60))),
+    sqlite_path=os.getenv(
+        "REC_CACHE_SQLITE_PATH", "/tmp/align_recommendation_cache.sqlite3"
+    ),
+    redis_url=os.getenv("REC_CACHE_REDIS_URL", "redis://localhost:6379/0"),
+)
+
+# --- Worker pool ---
+# Computations run on a fixed number of threads behind a bounded priority
+# queue. Interactive requests go ahead of background ones (batch sweeps,
+# warmups, notification checks); when the queue is full the API answers
+# 429 with Retry-After instead of spawning more threads and connections.
+compute_pool = workers.ComputePool(
+    workers=int(os.getenv("REC_WORKERS", "4")),
+    max_queue=int(os.getenv("REC_QUEUE_SIZE", "200")),
+)
+
+_PRIORITIES = {
+    "interactive": workers.PRIORITY_INTERACTIVE,
+    "background": workers.PRIORITY_BACKGROUND,
+}
+
+
+def _saturated(e: workers.PoolSaturated) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Recommendation service is busy, retry later.",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def _student_not_found() -> HTTPException:
+    return HTTPException(status_code=404, detail="Student not found")
+
+# --- Rankings for pagination ---
+# Each computation also keeps the student's top RANKING_DEPTH internship
+# ids and scores, under the same model/profile tag as the first page, so
+# ?cursor=&limit= pages are sliced from it instead of rescoring.
+RANKING_DEPTH = int(os.getenv("REC_RANKING_DEPTH", "500"))
+PAGE_SIZE = 10
+
+
+def _ranking_key(student_id: int) -> str:
+    return f"ranking:{student_id}"
+
+
+def _to_recommended(results) -> list[schemas.RecommendedInternship]:
+    recommendations = []
+    for internship, reason in results:
+        item = schemas.RecommendedInternship.model_validate(internship)
+        item.match_reason = reason
+        recommendations.append(item)
+    return recommendations
+
+
+def _cache_tag(model_version: str, profile_version: int | None) -> str:
+    """Cache entries are valid only for this model and profile version."""
+    return f"{model_version}:{profile_version}"
+
+
+def _profile_version(student_id: int) -> int | None:
+    db = SessionLocal()
+    try:
+        return crud.get_profile_version(db, student_id)
+    finally:
+        db.close()
+
+
+def _store_result(
+        student_id: int,
+        recommendations: list[schemas.RecommendedInternship],
+        tag: str,
+        ) -> dict:
+    # Stored as plain JSON-compatible data so shared backends can hold it.
+    result = {
+        "recommendations": [r.model_dump(mode="json") for r in recommendations],
+        "computing": False,
+    }
+    rec_cache.set(student_id, result, tag)
+    return result
+
+
+def _load_materialized(
+        student_id: int, profile_version: int | None
+        ) -> list[schemas.RecommendedInternship] | None:
+    """
+    Returns the student's rows from the nightly student_recommendations
+    table, or None if there are none or the profile has changed since
+    they were computed.
+    """
+    if profile_version is None:
+        return None
+    db = SessionLocal()
+    try:
+        rows = crud.get_materialized_recommendations(db, student_id)
+        if not rows or rows[0].profile_version != profile_version:
+            return None
+        return _to_recommended(
+            (row.internship, row.match_reason) for row in rows
+        )
+    finally:
+        db.close()
 
-# --- Per-student lock ---
-# Prevents multiple simultaneous requests for the same student from each
-# opening their own SSL connection. Concurrent requests queue behind the
-# first, then all return from cache once the first completes.
-_rec_locks: dict[int, threading.Lock] = {}
-_rec_locks_meta = threading.Lock()
-_rec_computing: set[int] = set()
 
+# --- Completion notifications for long-polling requests ---
+# Requests waiting on a student's computation register an asyncio.Event
+# here; _run_computation sets them from its worker thread when it
+# finishes. Waiters also re-check the cache periodically, which covers
+# computations running in another worker or replica.
+_waiters: dict[int, set[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+_waiters_lock = threading.Lock()
+_WAIT_POLL_INTERVAL = 1.0  # seconds
+MAX_WAIT_SECONDS = 30
 
-def _get_student_lock(student_id: int) -> threading.Lock:
-    with _rec_locks_meta:
-        if student_id not in _rec_locks:
-            _rec_locks[student_id] = threading.Lock()
-        return _rec_locks[student_id]
+
+def _notify_waiters(student_id: int):
+    with _waiters_lock:
+        waiters = list(_waiters.get(student_id, ()))
+    for loop, event in waiters:
+        loop.call_soon_threadsafe(event.set)
+
+
+async def _wait_for_result(
+        student_id: int,
+        profile_version: int | None,
+        timeout: float,
+        key=None,
+        ) -> dict | None:
+    """
+    Parks the request until the student's result (or the cache entry at
+    `key`, e.g. their ranking) is cached or `timeout` seconds pass.
+    Returns the entry, or None on timeout.
+    """
+    key = student_id if key is None else key
+    loop = asyncio.get_running_loop()
+    waiter = (loop, asyncio.Event())
+    with _waiters_lock:
+        _waiters.setdefault(student_id, set()).add(waiter)
+    deadline = loop.time() + timeout
+    try:
+        while True:
+            # Re-derive the tag: a new model may be published meanwhile.
+            tag = _cache_tag(model_store.current().version, profile_version)
+            result = await run_in_threadpool(rec_cache.get, key, tag)
+            if result is not None:
+                return result
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(
+                    waiter[1].wait(), timeout=min(remaining, _WAIT_POLL_INTERVAL)
+                )
+            except asyncio.TimeoutError:
+                pass
+            waiter[1].clear()
+    finally:
+        with _waiters_lock:
+            student_waiters = _waiters.get(student_id)
+            if student_waiters is not None:
+                student_waiters.discard(waiter)
+                if not student_waiters:
+                    del _waiters[student_id]
 
 
 def _run_computation(student_id: int):
     """Compute recommendations in a background thread and populate cache."""
+    started = time.perf_counter()
+    outcome = "error"
     db = SessionLocal()
     try:
-        student_profile = crud.get_student_profile(db, student_id=student_id)
+        with metrics.stage("profile_query"):
+            student_profile = crud.get_student_profile(db, student_id=student_id)
         if not student_profile:
+            outcome = "not_found"
             print(f"[background] Student {student_id} not found, skipping.")
             return
 
+        if not model_store.fitted:
+            model_store.refresh()
+        # Use one model for the whole computation, even if a newer one is
+        # published meanwhile.
+        recommender = model_store.current()
         if recommender.internship_matrix is None:
-            all_internships = crud.get_all_internships(db)
-            if not all_internships:
-                return
-            recommender.fit(all_internships)
-
-        results = recommender.recommend(student_profile, top_n=10)
-        recommendations = []
-        for internship, reason in results:
-            item = schemas.RecommendedInternship.model_validate(internship)
-            item.match_reason = reason
-            recommendations.append(item)
-
-        result = {"recommendations": recommendations, "computing": False}
-        _rec_cache[student_id] = result
-        _rec_cache_ts[student_id] = time.time()
+            outcome = "no_model"
+            return
+        tag = _cache_tag(recommender.version, student_profile.profile_version)
+        if rec_cache.contains(student_id, tag):
+            # A promoted duplicate of this job has already stored the result.
+            outcome = "cached"
+            return
+
+        # Rank once deep enough for later pages; the first page is its head.
+        ranking = recommender.rank(student_profile, top_k=RANKING_DEPTH)
+        ids = [internship_id for internship_id, _ in ranking]
+        results = recommender.results_for(student_profile, ids[:PAGE_SIZE])
+        with metrics.stage("cache_store"):
+            rec_cache.set(
+                _ranking_key(student_id),
+                {"ids": ids, "scores": [score for _, score in ranking]},
+                tag,
+            )
+            _store_result(student_id, _to_recommended(results), tag)
+        outcome = "ok"
         print(f"[background] Recommendations cached for student {student_id}")
     except Exception as e:
         print(f"[background] Error for student {student_id}: {e}")
         traceback.print_exc()
     finally:
-        with _rec_locks_meta:
-            _rec_computing.discard(student_id)
+        rec_cache.release(student_id)
         db.close()
+        _notify_waiters(student_id)
+        metrics.COMPUTATION_SECONDS.observe(outcome, time.perf_counter() - started)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Application startup...")
-    db = SessionLocal()
-    try:
-        all_internships = crud.get_all_internships(db)
-        if not all_internships:
-            print("WARNING: No internships found in the database to train on.")
-        else:
-            recommender.fit(all_internships)
-    finally:
-        db.close()
+    # Serve from the last snapshot if there is one. The scheduler's first
+    # check runs immediately in the background and rebuilds if the
+    # snapshot is stale or missing, so startup never blocks on TF-IDF.
+    model_store.load_snapshot()
+    model_store.start()
+    compute_pool.start()
     yield
+    model_store.stop()
+    compute_pool.stop()
     print("Application shutdown...")
 
 app = FastAPI(
@@ -113,6 +343,110 @@ app.add_middleware(
 )
 
 
+# --- Index Sync Endpoint ---
+@app.post("/internships/sync")
+def sync_internships():
+    """
+    Incrementally indexes internships added or deleted since the current
+    model was built, without waiting for the next scheduled check.
+    Called by the crawler after each run. In a follower worker this asks
+    the leader to rebuild, and the new model is attached once published.
+    """
+    updated = model_store.refresh()
+    model = model_store.current()
+    return {
+        "updated": updated,
+        "version": model.version,
+        "total": len(model.internship_ids),
+        "role": model_store.role,
+    }
+
+
+# --- Cache Stats Endpoint ---
+@app.get("/cache/stats")
+def get_cache_stats():
+    """
+    Size, hit/miss and eviction counters of the recommendation cache, plus
+    hit/miss counters of the student-vector and internship-row caches.
+    """
+    stats = rec_cache.stats()
+    stats["student_vectors"] = model_store.current().student_cache.stats()
+    stats["internship_rows"] = model_store.current().row_cache.stats()
+    return stats
+
+
+# --- Worker Stats Endpoint ---
+@app.get("/workers/stats")
+def get_worker_stats():
+    """Queue depth, running jobs and rejection count of the worker pool."""
+    return compute_pool.stats()
+
+
+# --- Metrics Endpoint ---
+def _collect_service_metrics():
+    """Cache, queue and model counters, read at scrape time."""
+    cache_stats = rec_cache.stats()
+    model = model_store.current()
+    vector_stats = model.student_cache.stats()
+    row_stats = model.row_cache.stats()
+    pool_stats = compute_pool.stats()
+    with _waiters_lock:
+        waiting = sum(len(w) for w in _waiters.values())
+    return [
+        ("recommender_cache_hits_total", "counter",
+         "Cache lookups that returned an entry.", [
+             ({"cache": "recommendations"}, cache_stats["hits"]),
+             ({"cache": "student_vectors"}, vector_stats["hits"]),
+             ({"cache": "internship_rows"}, row_stats["hits"]),
+         ]),
+        ("recommender_cache_misses_total", "counter",
+         "Cache lookups that found no valid entry.", [
+             ({"cache": "recommendations"}, cache_stats["misses"]),
+             ({"cache": "student_vectors"}, vector_stats["misses"]),
+             ({"cache": "internship_rows"}, row_stats["misses"]),
+         ]),
+        ("recommender_cache_entries", "gauge",
+         "Entries currently held by the cache.", [
+             ({"cache": name}, stats["entries"])
+             for name, stats in (
+                 ("recommendations", cache_stats),
+                 ("student_vectors", vector_stats),
+                 ("internship_rows", row_stats),
+             )
+             if "entries" in stats
+         ]),
+        ("recommender_queue_depth", "gauge",
+         "Jobs waiting for a worker.", [({}, pool_stats["queued"])]),
+        ("recommender_jobs_running", "gauge",
+         "Jobs currently running on a worker.", [({}, pool_stats["running"])]),
+        ("recommender_jobs_completed_total", "counter",
+         "Jobs finished by the worker pool.", [({}, pool_stats["completed"])]),
+        ("recommender_jobs_rejected_total", "counter",
+         "Submissions rejected because the queue was full.",
+         [({}, pool_stats["rejected"])]),
+        ("recommender_long_poll_waiters", "gauge",
+         "Requests parked waiting for a computation.", [({}, waiting)]),
+        ("recommender_indexed_internships", "gauge",
+         "Internships in the published model.",
+         [({}, len(model.internship_ids))]),
+        ("recommender_model_leader", "gauge",
+         "1 if this process builds models, 0 if it attaches the leader's.",
+         [({}, int(model_store.role != "follower"))]),
+    ]
+
+
+metrics.register_collector(_collect_service_metrics)
+
+
+@app.get("/metrics")
+def get_metrics():
+    """
+    Per-stage latency histograms plus cache, queue and model metrics, in
+    the Prometheus text exposition format.
+    """
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # --- Status Endpoint ---
 @app.get("/recommendations/{student_id}/status")
 def get_recommendation_status(student_id: int):
@@ -120,46 +454,334 @@ def get_recommendation_status(student_id: int):
     Non-blocking check: returns whether recommendations are cached and fresh,
     and whether a background computation is currently running.
     """
-    now = time.time()
-    cached = (
-        student_id in _rec_cache
-        and (now - _rec_cache_ts.get(student_id, 0)) < _REC_CACHE_TTL
-    )
-    computing = student_id in _rec_computing
+    tag = _cache_tag(model_store.current().version, _profile_version(student_id))
+    cached = rec_cache.contains(student_id, tag)
+    computing = rec_cache.is_claimed(student_id)
     return {"cached": cached, "computing": computing}
 
 
+def _without_reasons(result: dict) -> dict:
+    return {
+        **result,
+        "recommendations": [
+            {**r, "match_reason": None} for r in result["recommendations"]
+        ],
+    }
+
+
+def _start_computation(student_id: int, priority: int):
+    """
+    Queues a computation unless any worker already claimed it. A claim
+    queued at a less urgent priority (e.g. by a background notification
+    check) does not hold an interactive request back: the computation is
+    queued again at `priority`, and whichever job finishes first stores
+    the result and releases the claim. Raises PoolSaturated if the worker
+    queue is full.
+    """
+    if rec_cache.claim(student_id, priority):
+        try:
+            compute_pool.submit(_run_computation, student_id, priority=priority)
+        except workers.PoolSaturated:
+            rec_cache.release(student_id)
+            raise
+        print(f"[background] Queued computation for student {student_id}")
+    elif rec_cache.promote(student_id, priority):
+        # The earlier job keeps the claim; if this one cannot be queued,
+        # the request is answered 429 and the earlier job still runs.
+        compute_pool.submit(_run_computation, student_id, priority=priority)
+        print(f"[background] Promoted computation for student {student_id}")
+
+
+def _lookup_or_start(
+        student_id: int, priority: int
+        ) -> tuple[dict | None, int | None]:
+    """
+    Returns (result, profile_version). The result comes from the cache or
+    the materialized table; if neither has it, a computation is queued
+    (unless one is already running) and the result is None. Raises
+    PoolSaturated if the worker queue is full, and a 404 before claiming
+    anything if the student does not exist.
+    """
+    # Fast path: cached for the live model and the current profile
+    profile_version = _profile_version(student_id)
+    if profile_version is None:
+        raise _student_not_found()
+    tag = _cache_tag(model_store.current().version, profile_version)
+    cached = rec_cache.get(student_id, tag)
+    if cached is not None:
+        print(f"[cache] Returning cached recommendations for student {student_id}")
+        return cached, profile_version
+
+    # Next: the nightly materialized table, unless the profile has changed
+    materialized = _load_materialized(student_id, profile_version)
+    if materialized is not None:
+        print(f"[materialized] Returning stored recommendations for student {student_id}")
+        return _store_result(student_id, materialized, tag), profile_version
+
+    _start_computation(student_id, priority)
+    return None, profile_version
+
+
+def _lookup_ranking_or_start(
+        student_id: int, priority: int
+        ) -> tuple[dict | None, int | None]:
+    """
+    Like _lookup_or_start(), for the student's cached ranking. Returns
+    (ranking, profile_version).
+    """
+    profile_version = _profile_version(student_id)
+    if profile_version is None:
+        raise _student_not_found()
+    tag = _cache_tag(model_store.current().version, profile_version)
+    ranking = rec_cache.get(_ranking_key(student_id), tag)
+    if ranking is not None:
+        return ranking, profile_version
+
+    _start_computation(student_id, priority)
+    return None, profile_version
+
+
+def _load_page(
+        student_id: int, ranking: dict, offset: int, limit: int, reasons: bool
+        ) -> dict:
+    """One page of a cached ranking, with rows and (optionally) reasons."""
+    ids = ranking["ids"][offset:offset + limit]
+    db = SessionLocal()
+    try:
+        student = crud.get_student_profile(db, student_id=student_id)
+        results = (
+            model_store.current().results_for(student, ids, with_reasons=reasons)
+            if student and ids else []
+        )
+    finally:
+        db.close()
+    end = offset + limit
+    return {
+        "recommendations": _to_recommended(results),
+        "computing": False,
+        "next_cursor": end if end < len(ranking["ids"]) else None,
+    }
+
+
+async def _get_page(
+        student_id: int,
+        offset: int,
+        limit: int,
+        wait: float,
+        priority: int,
+        reasons: bool,
+        ) -> dict:
+    try:
+        ranking, profile_version = await run_in_threadpool(
+            _lookup_ranking_or_start, student_id, priority
+        )
+    except workers.PoolSaturated as e:
+        raise _saturated(e)
+    if ranking is None and wait > 0:
+        ranking = await _wait_for_result(
+            student_id, profile_version, wait, key=_ranking_key(student_id)
+        )
+    if ranking is None:
+        return {"recommendations": [], "computing": True}
+    return await run_in_threadpool(
+        _load_page, student_id, ranking, offset, limit, reasons
+    )
+
+
+def _compute_filtered(
+        student_id: int,
+        offset: int,
+        limit: int,
+        reasons: bool,
+        location: str | None,
+        source: str | None,
+        posted_within_days: int | None,
+        ) -> dict | None:
+    """
+    One page of recommendations restricted by location, source and/or
+    recency. Filters are applied as row masks before ranking, so this is
+    as cheap as an unfiltered scoring pass and is not cached. Returns
+    None if the student does not exist.
+    """
+    db = SessionLocal()
+    try:
+        student = crud.get_student_profile(db, student_id=student_id)
+        if not student:
+            return None
+        if not model_store.fitted:
+            model_store.refresh()
+        recommender = model_store.current()
+        posted_after = (
+            time.time() - posted_within_days * 24 * 60 * 60
+            if posted_within_days else None
+        )
+        mask = recommender.filter_mask(location, source, posted_after)
+        # One extra row tells whether there is a next page.
+        depth = min(offset + limit + 1, RANKING_DEPTH)
+        ids = [i for i, _ in recommender.rank(student, top_k=depth, mask=mask)]
+        results = recommender.results_for(
+            student, ids[offset:offset + limit], with_reasons=reasons
+        )
+    finally:
+        db.close()
+    end = offset + limit
+    return {
+        "recommendations": _to_recommended(results),
+        "computing": False,
+        "next_cursor": end if len(ids) > end else None,
+    }
+
+
+# --- Explain Endpoint ---
+@app.get(
+        "/recommendations/{student_id}/explain/{internship_id}",
+        response_model=schemas.MatchExplanation
+        )
+def explain_recommendation(student_id: int, internship_id: int):
+    """
+    Match reason for one internship, for clients that fetch
+    recommendations with reasons=false and explain a card on demand.
+    """
+    db = SessionLocal()
+    try:
+        student = crud.get_student_profile(db, student_id=student_id)
+        if not student:
+            raise _student_not_found()
+        reason = model_store.current().explain(student, internship_id)
+    finally:
+        db.close()
+    if reason is None:
+        raise HTTPException(status_code=404, detail="Internship not indexed")
+    return {"internship_id": internship_id, "match_reason": reason}
+
+
 # --- API Endpoint ---
 @app.get(
         "/recommendations/{student_id}",
         response_model=schemas.RecommendationResponse
         )
-def get_recommendations_for_student(
+async def get_recommendations_for_student(
     student_id: int,
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+    priority: Literal["interactive", "background"] = "interactive",
+    reasons: bool = True,
+    cursor: int | None = Query(None, ge=0),
+    limit: int | None = Query(None, ge=1, le=100),
+    location: str | None = None,
+    source: str | None = None,
+    posted_within_days: int | None = Query(None, ge=1, le=365),
 ):
     """
     Returns recommendations for a student.
-    If the result is cached it returns immediately.
-    If not, it starts a background thread to compute and returns
-    {computing: true, recommendations: []} so the frontend can poll
-    /status and re-fetch once the cache is populated.
-    """
-    now = time.time()
-
-    # Fast path: already cached and fresh
-    if student_id in _rec_cache:
-        age = now - _rec_cache_ts.get(student_id, 0)
-        if age < _REC_CACHE_TTL:
-            print(f"[cache] Returning cached recommendations for student {student_id}")
-            return _rec_cache[student_id]
-
-    # Kick off background computation if not already running
-    with _rec_locks_meta:
-        if student_id not in _rec_computing:
-            _rec_computing.add(student_id)
-            t = threading.Thread(target=_run_computation, args=(student_id,), daemon=True)
-            t.start()
-            print(f"[background] Started computation for student {student_id}")
-
-    # Return immediately — frontend will poll /status and re-fetch
+    If the result is cached for the current model and profile version, or
+    materialized by the nightly job for the current profile version, it
+    returns immediately.
+    If not, it starts a background computation. With `wait` > 0 the
+    request is held until the computation finishes or `wait` seconds
+    pass (long-poll), so one request usually suffices. Otherwise, or on
+    timeout, it returns {computing: true, recommendations: []} so the
+    client can re-fetch later.
+    Background callers (sweeps, notification checks) pass
+    priority=background so dashboard requests are computed first. Answers
+    429 with Retry-After when the worker queue is full.
+    With reasons=false, match reasons are left out of the response; fetch
+    one with /recommendations/{student_id}/explain/{internship_id}.
+    Responses carry next_cursor; pass it back as ?cursor= (with an
+    optional ?limit=, default 10) to page through the student's top
+    RANKING_DEPTH matches without rescoring.
+    location (whole word, e.g. "Sydney"), source (e.g. "LinkedIn") and
+    posted_within_days restrict the results before ranking; filtered
+    requests are computed directly on the worker pool and page the same
+    way.
+    """
+    if location or source or posted_within_days:
+        try:
+            future = compute_pool.submit(
+                _compute_filtered, student_id, cursor or 0, limit or PAGE_SIZE,
+                reasons, location, source, posted_within_days,
+                priority=_PRIORITIES[priority],
+            )
+        except workers.PoolSaturated as e:
+            raise _saturated(e)
+        result = await asyncio.wrap_future(future)
+        if result is None:
+            raise _student_not_found()
+        return result
+
+    if cursor is not None or limit is not None:
+        return await _get_page(
+            student_id, cursor or 0, limit or PAGE_SIZE,
+            wait, _PRIORITIES[priority], reasons,
+        )
+
+    try:
+        result, profile_version = await run_in_threadpool(
+            _lookup_or_start, student_id, _PRIORITIES[priority]
+        )
+    except workers.PoolSaturated as e:
+        raise _saturated(e)
+    if result is None and wait > 0:
+        result = await _wait_for_result(student_id, profile_version, wait)
+    if result is not None:
+        if not reasons:
+            result = _without_reasons(result)
+        if len(result["recommendations"]) == PAGE_SIZE:
+            result = {**result, "next_cursor": PAGE_SIZE}
+        return result
+
+    # Still computing — client will re-fetch (optionally with ?wait=)
     return {"recommendations": [], "computing": True}
+
+
+def _compute_batch(request: schemas.BatchRecommendationRequest) -> dict:
+    db = SessionLocal()
+    try:
+        students = crud.get_student_profiles(db, request.student_ids)
+        if not model_store.fitted:
+            model_store.refresh()
+        recommender = model_store.current()
+        batch = recommender.recommend_many(
+            students, top_n=request.top_n, with_reasons=request.include_reasons
+        )
+    finally:
+        db.close()
+
+    results = []
+    cacheable = (
+        request.top_n == 10
+        and request.include_reasons
+        and recommender.internship_matrix is not None
+    )
+    for student, student_results in zip(students, batch):
+        recommendations = _to_recommended(student_results)
+        if cacheable:
+            _store_result(
+                student.id,
+                recommendations,
+                _cache_tag(recommender.version, student.profile_version),
+            )
+        results.append({"student_id": student.id, "recommendations": recommendations})
+    return {"results": results}
+
+
+# --- Batch Endpoint ---
+@app.post(
+        "/recommendations/batch",
+        response_model=schemas.BatchRecommendationResponse
+        )
+async def get_recommendations_batch(request: schemas.BatchRecommendationRequest):
+    """
+    Scores many students in one pass: profiles are loaded in one query and
+    ranked with a single students × internships sparse product. Used for
+    notification sweeps and cache warmups; results for the default top_n
+    also populate the per-student cache (unless include_reasons is off,
+    which skips match-reason generation). Runs on the worker pool at
+    background priority and answers 429 when the queue is full.
+    """
+    try:
+        future = compute_pool.submit(
+            _compute_batch, request, priority=workers.PRIORITY_BACKGROUND
+        )
+    except workers.PoolSaturated as e:
+        raise _saturated(e)
+    return await asyncio.wrap_future(future)
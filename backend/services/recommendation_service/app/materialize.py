@@ -0,0 +1,127 @@
+# services/recommendation-service/app/materialize.py
+#
+# Offline job that precomputes top-N recommendations for every student and
+# bulk-writes them into the student_recommendations table, so the first
+# dashboard load after a deploy or cache expiry is served from the table
+# instead of returning {"computing": true}.
+#
+# Intended to run nightly (e.g. from a scheduler/cron), from backend/:
+#
+#   python -m services.recommendation_service.app.materialize
+
+import argparse
+import os
+import time
+
+from shared.core.database import SessionLocal, engine
+from shared.core import models
+from . import crud, scheduler
+from .core import TFIDFRecommender
+
+
+def materialize_all(
+        recommender: TFIDFRecommender,
+        top_n: int = 10,
+        batch_size: int = 200,
+        ) -> int:
+    """
+    Scores every student with `recommender` in batches and replaces their
+    rows in student_recommendations. Returns the number of students written.
+    """
+    db = SessionLocal()
+    try:
+        student_ids = crud.get_all_student_ids(db)
+    finally:
+        db.close()
+
+    written = 0
+    for start in range(0, len(student_ids), batch_size):
+        batch_ids = student_ids[start:start + batch_size]
+        db = SessionLocal()
+        try:
+            students = crud.get_student_profiles(db, batch_ids)
+            batch = recommender.recommend_many(students, top_n=top_n)
+            rows = []
+            for student, results in zip(students, batch):
+                for rank, (internship, reason) in enumerate(results):
+                    rows.append({
+                        "student_id": student.id,
+                        "internship_id": internship.id,
+                        "rank": rank,
+                        "match_reason": reason,
+                        "model_version": recommender.version,
+                        "profile_version": student.profile_version,
+                    })
+            crud.replace_materialized_recommendations(db, batch_ids, rows)
+            written += len(students)
+        finally:
+            db.close()
+        print(f"[materialize] {written}/{len(student_ids)} students written")
+    return written
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Precompute recommendations for every student"
+    )
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument(
+        "--snapshot-dir",
+        default=os.getenv(
+            "RECOMMENDER_SNAPSHOT_DIR", "/tmp/align_recommender_snapshot"
+        ),
+    )
+    parser.add_argument(
+        "--engine", default=os.getenv("RECOMMENDER_ENGINE", "tfidf"),
+        choices=["tfidf", "lsa"],
+    )
+    parser.add_argument(
+        "--lsa-dimensions", type=int,
+        default=int(os.getenv("RECOMMENDER_LSA_DIMENSIONS", "256")),
+    )
+    parser.add_argument(
+        "--matrix-dtype", default=os.getenv("RECOMMENDER_MATRIX_DTYPE", "float64"),
+        choices=["float64", "float32"],
+    )
+    parser.add_argument(
+        "--max-terms", type=int,
+        default=int(os.getenv("RECOMMENDER_MAX_TERMS", "0")),
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    models.Base.metadata.create_all(bind=engine)
+
+    # Reuse the service's snapshot when it is current; otherwise refit in
+    # memory. The job never writes snapshots: the service's leader owns
+    # the directory, and a model built with other flags than the
+    # service's would only be rejected by its workers.
+    store = scheduler.ModelScheduler(
+        SessionLocal,
+        snapshot_dir=args.snapshot_dir,
+        read_only=True,
+        engine=args.engine,
+        lsa_dimensions=args.lsa_dimensions,
+        matrix_dtype=args.matrix_dtype,
+        max_terms=args.max_terms,
+    )
+    store.load_snapshot()
+    store.refresh()
+    recommender = store.current()
+    if recommender.internship_matrix is None:
+        print("[materialize] No model available; nothing to do.")
+        return
+
+    started = time.time()
+    written = materialize_all(
+        recommender, top_n=args.top_n, batch_size=args.batch_size
+    )
+    print(f"[materialize] Done: {written} students with model "
+          f"{recommender.version} in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
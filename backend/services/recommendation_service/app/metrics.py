@@ -0,0 +1,150 @@
+# services/recommendation-service/app/metrics.py
+#
+# Latency histograms for the recommendation pipeline, exposed in the
+# Prometheus text format without a client-library dependency.
+#
+# Pipeline code wraps each stage in `with stage("similarity"):`; the
+# elapsed time is recorded in the recommender_stage_seconds histogram
+# under that stage label. Values other components already count (cache
+# hits, queue depth) are read at scrape time from collectors registered
+# with register_collector(), so nothing is tracked twice.
+
+import bisect
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds. Stages range from tens of microseconds (top-k on a small
+# corpus) to seconds (a cold computation on a large one).
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one label dimension."""
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            label: str,
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+            ):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label value -> [per-bucket counts (last is +Inf), sum]
+        self._series: dict[str, list] = {}
+
+    def observe(self, label_value: str, value: float):
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [
+                    [0] * (len(self.buckets) + 1), 0.0
+                ]
+            series[0][bucket] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, label_value: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(label_value, time.perf_counter() - started)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            snapshot = {k: (list(v[0]), v[1]) for k, v in self._series.items()}
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for label_value in sorted(snapshot):
+            counts, total = snapshot[label_value]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _labels({self.label: label_value, "le": _number(float(bound))})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels({self.label: label_value})
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "recommender_stage_seconds",
+    "Time spent in each stage of the recommendation pipeline.",
+    "stage",
+)
+COMPUTATION_SECONDS = Histogram(
+    "recommender_computation_seconds",
+    "End-to-end time of background recommendation computations.",
+    "outcome",
+)
+_HISTOGRAMS = [STAGE_SECONDS, COMPUTATION_SECONDS]
+
+
+def stage(name: str):
+    """Times the enclosed block as pipeline stage `name`."""
+    return STAGE_SECONDS.time(name)
+
+
+# --- Scrape-time collectors ---
+# A collector returns (name, type, help, samples) tuples, where samples
+# are (labels, value) pairs. Types are "counter" or "gauge".
+Metric = tuple[str, str, str, Iterable[tuple[dict, float]]]
+_collectors: list[Callable[[], Iterable[Metric]]] = []
+
+
+def register_collector(collector: Callable[[], Iterable[Metric]]):
+    _collectors.append(collector)
+
+
+def render() -> str:
+    """All histograms and collected metrics in the Prometheus text format."""
+    lines: list[str] = []
+    for histogram in _HISTOGRAMS:
+        lines.extend(histogram.render())
+    for collector in _collectors:
+        try:
+            metrics = list(collector())
+        except Exception as e:
+            # e.g. a shared cache backend that is unreachable right now
+            print(f"[metrics] Collector {getattr(collector, '__name__', collector)} failed: {e}")
+            traceback.print_exc()
+            continue
+        for name, kind, documentation, samples in metrics:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
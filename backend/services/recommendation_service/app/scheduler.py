@@ -0,0 +1,335 @@
+# services/recommendation-service/app/scheduler.py
+#
+# Keeps the published recommender in step with the internships table.
+#
+# Request threads never see a model being modified: every rebuild works on
+# a fresh TFIDFRecommender (or a copy of the current one for incremental
+# updates) and is published with a single reference assignment. Readers
+# call current() once and use that object for the whole computation.
+#
+# Several worker processes can share one snapshot_dir. The process holding
+# an exclusive lock on <snapshot_dir>/leader.lock is the leader: it alone
+# rebuilds models and saves snapshots. The others are followers: they
+# memory-map each snapshot the leader publishes, so the model is fitted
+# once and its arrays are shared through the page cache instead of being
+# copied into every worker. The OS releases the lock if the leader exits,
+# and the next follower to poll takes over.
+
+import hashlib
+import os
+import threading
+import time
+import traceback
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: every process builds its own model
+    fcntl = None
+
+from sqlalchemy.orm import Session
+
+from shared.core import models
+from . import crud, snapshot
+from .core import StudentVectorCache, TFIDFRecommender, create_recommender
+
+
+LEADER_LOCK = "leader.lock"
+# Created by a follower asking the leader to check for changes now.
+REFRESH_REQUEST = "refresh.request"
+# Seconds between a follower's checks for a new snapshot (and a leader's
+# checks for refresh requests).
+POLL_INTERVAL = 2.0
+
+
+def model_version(fingerprint: str) -> str:
+    """Short, stable version tag derived from a table fingerprint."""
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:12]
+
+
+class ModelScheduler:
+    def __init__(
+            self,
+            session_factory: Callable[[], Session],
+            snapshot_dir: Optional[str] = None,
+            interval: float = 300,
+            engine: str = "tfidf",
+            lsa_dimensions: int = 256,
+            load_batch_size: int = 2000,
+            matrix_dtype: str = "float64",
+            max_terms: int = 0,
+            read_only: bool = False,
+            ):
+        self._session_factory = session_factory
+        # Rows per batch when streaming the table into a full rebuild.
+        self._load_batch_size = load_batch_size
+        # Scoring engine for every model this scheduler builds (see
+        # core.create_recommender).
+        self._engine = engine
+        self._lsa_dimensions = lsa_dimensions
+        self._matrix_dtype = matrix_dtype
+        self._max_terms = max_terms
+        self._snapshot_dir = snapshot_dir
+        # Loads snapshots from snapshot_dir but never writes there; for
+        # offline jobs that share the service's directory without taking
+        # part in leader election.
+        self._read_only = read_only
+        self._interval = interval
+        # One student-vector cache for every model this scheduler publishes;
+        # entries are keyed by vocabulary version, so stale ones just age out.
+        self._student_cache = StudentVectorCache()
+        self._model = self._new_model()
+        self._fingerprint: Optional[str] = None
+        # Snapshot directory the published model was loaded from or saved to.
+        self._snapshot_name: Optional[str] = None
+        # Last snapshot that could not be used (unreadable, or another
+        # variant); followers skip it until CURRENT names a new one.
+        self._rejected_snapshot: Optional[str] = None
+        # "standalone" until start(), then "leader" or "follower".
+        self.role = "standalone"
+        self._lock_file = None
+        # Serialises rebuilds; readers never take it.
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _new_model(self) -> TFIDFRecommender:
+        return create_recommender(
+            self._engine,
+            lsa_dimensions=self._lsa_dimensions,
+            matrix_dtype=self._matrix_dtype,
+            max_terms=self._max_terms,
+            student_cache=self._student_cache,
+        )
+
+    # --- Reader API ---
+
+    def current(self) -> TFIDFRecommender:
+        """The published model. Never mutated after publication."""
+        return self._model
+
+    @property
+    def fitted(self) -> bool:
+        return self._model.internship_matrix is not None
+
+    # --- Publishing ---
+
+    def _publish(self, model: TFIDFRecommender, fingerprint: str):
+        # The engine and matrix storage are part of the version so
+        # switching either invalidates cached recommendations.
+        model.version = model_version(f"{model.variant()}:{fingerprint}")
+        model.row_loader = self._load_rows
+        model.student_cache = self._student_cache
+        self._fingerprint = fingerprint
+        self._model = model
+        print(f"[scheduler] Published model {model.version} "
+              f"({len(model.internship_ids)} internships)")
+
+    def _load_rows(self, internship_ids: list[int]) -> list[models.Internship]:
+        """Row loader for published models, which keep no ORM rows."""
+        db = self._session_factory()
+        try:
+            return crud.get_internships_by_ids(db, internship_ids)
+        finally:
+            db.close()
+
+    def load_snapshot(self) -> bool:
+        """Publishes the on-disk snapshot, if any. Returns True on success."""
+        if not self._snapshot_dir:
+            return False
+        name = snapshot.current_name(self._snapshot_dir)
+        restored, fingerprint = snapshot.load_snapshot(self._snapshot_dir, name)
+        if restored is None:
+            self._rejected_snapshot = name
+            return False
+        expected = self._new_model().variant()
+        if restored.variant() != expected:
+            print(f"[snapshot] Ignoring {restored.variant()} snapshot; "
+                  f"configured for {expected}")
+            self._rejected_snapshot = name
+            return False
+        with self._build_lock:
+            self._publish(restored, fingerprint)
+            self._snapshot_name = name
+        return True
+
+    def _save_snapshot(self, model: TFIDFRecommender, fingerprint: str):
+        if not self._snapshot_dir or self._read_only:
+            return
+        try:
+            target = snapshot.save_snapshot(model, self._snapshot_dir, fingerprint)
+            if target:
+                self._snapshot_name = os.path.basename(target)
+        except Exception as e:
+            print(f"[snapshot] Could not save snapshot: {e}")
+
+    # --- Rebuilding ---
+
+    def _build_full(self, db: Session) -> Optional[TFIDFRecommender]:
+        # Streamed in batches, so the whole table is never materialised.
+        model = self._new_model()
+        model.fit_batches(crud.iter_internship_batches(db, self._load_batch_size))
+        if model.internship_matrix is None:
+            print("WARNING: No internships found in the database to train on.")
+            return None
+        return model
+
+    def _build_incremental(
+            self, db: Session, current: TFIDFRecommender
+            ) -> Optional[TFIDFRecommender]:
+        # Postings edited in place since the current model was built.
+        # Without a watermark (a snapshot from before updated_at was
+        # tracked) edits cannot be told apart, so rebuild everything.
+        built_through = crud.fingerprint_updated_at(self._fingerprint)
+        if built_through is None:
+            return self._build_full(db)
+        db_ids = set(crud.get_internship_ids(db))
+        indexed_ids = set(current.internship_ids.tolist())
+        new_ids = db_ids - indexed_ids
+        removed_ids = indexed_ids - db_ids
+        changed_ids = (
+            set(crud.get_internship_ids_updated_since(db, built_through))
+            & indexed_ids
+        )
+        if not new_ids and not removed_ids and not changed_ids:
+            return self._build_full(db)
+        pending = len(new_ids) + len(removed_ids) + len(changed_ids)
+        if current._needs_refit(pending):
+            # Too far from the fitted vocabulary; refit through the
+            # streamed, column-projected load rather than reloading every
+            # indexed row by id.
+            print(f"[scheduler] Drift limit reached with {pending} pending "
+                  "changes; rebuilding.")
+            return self._build_full(db)
+
+        model = current.copy()
+        model.remove_internships(sorted(removed_ids))
+        # add_internships() re-indexes ids it already holds and drops them
+        # from the row cache, so edited rows are re-vectorized and served
+        # fresh.
+        model.add_internships(
+            crud.get_internships_by_ids(db, sorted(new_ids | changed_ids))
+        )
+        print(f"[scheduler] Incremental update: +{len(new_ids)} "
+              f"-{len(removed_ids)} ~{len(changed_ids)} internships")
+        return model
+
+    def refresh(self) -> bool:
+        """
+        Rebuilds and publishes a new model if the internships table changed
+        since the current one was built. Returns True if a new model was
+        published.
+
+        A follower does not build: it asks the leader to check now and
+        attaches the newest snapshot the leader has published so far.
+        """
+        if self.role == "follower":
+            self._request_refresh()
+            return self._follow()
+        with self._build_lock:
+            db = self._session_factory()
+            try:
+                fingerprint = crud.get_internships_fingerprint(db)
+                if fingerprint == self._fingerprint:
+                    return False
+                current = self._model
+                if current.internship_matrix is None:
+                    model = self._build_full(db)
+                else:
+                    model = self._build_incremental(db, current)
+            finally:
+                db.close()
+            if model is None:
+                return False
+            self._publish(model, fingerprint)
+            self._save_snapshot(model, fingerprint)
+        return True
+
+    # --- Leader election ---
+
+    def _try_lead(self) -> bool:
+        """Takes the leader lock if it is free. Returns True if leader."""
+        if self.role == "leader":
+            return True
+        if not self._snapshot_dir or fcntl is None:
+            self.role = "leader"
+            return True
+        os.makedirs(self._snapshot_dir, exist_ok=True)
+        lock_file = open(os.path.join(self._snapshot_dir, LEADER_LOCK), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            self.role = "follower"
+            return False
+        if self.role == "follower":
+            print("[scheduler] Leader lock acquired; taking over rebuilds")
+        self._lock_file = lock_file
+        self.role = "leader"
+        return True
+
+    def _request_refresh(self):
+        try:
+            with open(os.path.join(self._snapshot_dir, REFRESH_REQUEST), "w"):
+                pass
+        except OSError as e:
+            print(f"[scheduler] Could not request a refresh: {e}")
+
+    def _take_refresh_request(self) -> bool:
+        if not self._snapshot_dir:
+            return False
+        try:
+            os.remove(os.path.join(self._snapshot_dir, REFRESH_REQUEST))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _follow(self) -> bool:
+        """Attaches the leader's newest snapshot if not already published."""
+        name = snapshot.current_name(self._snapshot_dir)
+        if name is None or name in (self._snapshot_name, self._rejected_snapshot):
+            return False
+        return self.load_snapshot()
+
+    # --- Background loop ---
+
+    def _run(self):
+        last_refresh = None
+        while True:
+            try:
+                if self._try_lead():
+                    due = (
+                        last_refresh is None
+                        or time.monotonic() - last_refresh >= self._interval
+                    )
+                    if self._take_refresh_request() or due:
+                        last_refresh = time.monotonic()
+                        self.refresh()
+                else:
+                    self._follow()
+            except Exception as e:
+                print(f"[scheduler] Refresh failed: {e}")
+                traceback.print_exc()
+            if self._stop.wait(min(self._interval, POLL_INTERVAL)):
+                return
+
+    def start(self):
+        """
+        Elects this process leader or follower and starts polling; a
+        leader's first check runs immediately.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._try_lead()
+        print(f"[scheduler] Running as {self.role}")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+        self.role = "standalone"
@@ -1,6 +1,6 @@
 # services/recommendation-service/app/schemas.py
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -32,3 +32,29 @@ class RecommendedInternship(Internship):
 class RecommendationResponse(BaseModel):
     recommendations: List[RecommendedInternship]
     computing: bool = False
+    # Offset to pass as ?cursor= for the next page; None on the last page.
+    next_cursor: Optional[int] = None
+
+
+class BatchRecommendationRequest(BaseModel):
+    """Students to score together in one batch."""
+    student_ids: List[int] = Field(..., min_length=1, max_length=500)
+    top_n: int = Field(10, ge=1, le=100)
+    # Sweeps that only need ids can skip match reasons.
+    include_reasons: bool = True
+
+
+class StudentRecommendations(BaseModel):
+    student_id: int
+    recommendations: List[RecommendedInternship]
+
+
+class BatchRecommendationResponse(BaseModel):
+    # Students that do not exist are omitted.
+    results: List[StudentRecommendations]
+
+
+class MatchExplanation(BaseModel):
+    """Match reason for one recommended internship, fetched on demand."""
+    internship_id: int
+    match_reason: str
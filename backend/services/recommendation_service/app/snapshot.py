@@ -0,0 +1,257 @@
+# services/recommendation-service/app/snapshot.py
+#
+# On-disk snapshots of a fitted TFIDFRecommender.
+#
+# A snapshot is a directory of plain .npy arrays plus a meta.json file, so
+# every array can be opened with np.load(mmap_mode='r') and paged in lazily
+# instead of refitting TF-IDF on every boot. Layout:
+#
+#   <root>/CURRENT              name of the live snapshot directory
+#   <root>/<name>/meta.json     format version, fingerprint, matrix shape
+#   <root>/<name>/*.npy         vocabulary, IDF, CSR arrays, ids, masks,
+#                               title and match-reason indexes, filter columns
+#
+# CURRENT is replaced atomically, so a reader never sees a half-written
+# snapshot and workers that still map an older snapshot keep a valid view.
+
+import json
+import os
+import shutil
+import time
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+
+from .core import LSARecommender, TFIDFRecommender, create_recommender
+
+SNAPSHOT_FORMAT_VERSION = 3
+
+_ARRAYS = (
+    "vocabulary_blob", "vocabulary_offsets", "idf",
+    "data", "indices", "indptr",
+    "internship_ids", "domain_masks",
+    "title_blob", "title_offsets", "title_codes",
+    "reason_blob", "reason_offsets", "reason_indices", "reason_indptr",
+    "location_blob", "location_offsets", "location_codes",
+    "source_blob", "source_offsets", "source_codes", "created_at",
+)
+# Written only by the LSA engine, once its projection is fitted.
+_LSA_ARRAYS = ("lsa_components", "lsa_embeddings")
+
+
+def _pack_strings(strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Encodes strings as one UTF-8 byte array plus an offsets array."""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+def _unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> list[str]:
+    raw = bytes(blob)
+    return [
+        raw[start:end].decode("utf-8")
+        for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())
+    ]
+
+
+def save_snapshot(
+        recommender: TFIDFRecommender, root: str, fingerprint: str
+        ) -> Optional[str]:
+    """
+    Writes the recommender's fitted state under `root` and makes it the
+    current snapshot. Returns the snapshot directory, or None if the
+    recommender has not been fitted.
+    """
+    matrix = recommender.internship_matrix
+    if matrix is None:
+        return None
+    matrix = matrix.tocsr()
+
+    os.makedirs(root, exist_ok=True)
+    name = f"snapshot-{time.time_ns()}"
+    target = os.path.join(root, name)
+    os.makedirs(target)
+
+    vocabulary_blob, vocabulary_offsets = _pack_strings(
+        list(recommender.vectorizer.get_feature_names_out())
+        )
+    title_blob, title_offsets = _pack_strings(recommender._unique_titles)
+    reason_terms = sorted(
+        recommender._reason_vocabulary, key=recommender._reason_vocabulary.get
+        )
+    reason_blob, reason_offsets = _pack_strings(reason_terms)
+    reason_index = recommender._reason_index.tocsr()
+    location_blob, location_offsets = _pack_strings(recommender._locations)
+    source_blob, source_offsets = _pack_strings(recommender._sources)
+    arrays = {
+        "vocabulary_blob": vocabulary_blob,
+        "vocabulary_offsets": vocabulary_offsets,
+        "idf": recommender.vectorizer.idf_,
+        "data": matrix.data,
+        "indices": matrix.indices,
+        "indptr": matrix.indptr,
+        "internship_ids": recommender.internship_ids,
+        "domain_masks": recommender.internship_domain_masks,
+        "title_blob": title_blob,
+        "title_offsets": title_offsets,
+        "title_codes": recommender._title_codes,
+        "reason_blob": reason_blob,
+        "reason_offsets": reason_offsets,
+        "reason_indices": reason_index.indices,
+        "reason_indptr": reason_index.indptr,
+        "location_blob": location_blob,
+        "location_offsets": location_offsets,
+        "location_codes": recommender._location_codes,
+        "source_blob": source_blob,
+        "source_offsets": source_offsets,
+        "source_codes": recommender._source_codes,
+        "created_at": recommender.internship_created_at,
+    }
+    keys = list(_ARRAYS)
+    lsa = (
+        isinstance(recommender, LSARecommender)
+        and recommender.lsa_components is not None
+    )
+    if lsa:
+        arrays["lsa_components"] = recommender.lsa_components
+        arrays["lsa_embeddings"] = recommender.internship_embeddings
+        keys.extend(_LSA_ARRAYS)
+    for key in keys:
+        np.save(os.path.join(target, f"{key}.npy"), np.asarray(arrays[key]))
+
+    meta = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "fingerprint": fingerprint,
+        "engine": recommender.ENGINE,
+        "lsa_dimensions": getattr(recommender, "dimensions", None),
+        "lsa": lsa,
+        "matrix_dtype": recommender.matrix_dtype.name,
+        "max_terms": recommender.max_terms,
+        "vocabulary_version": recommender.vocabulary_version,
+        "shape": list(matrix.shape),
+        "fitted_size": recommender._fitted_size,
+        "incremental_changes": recommender._incremental_changes,
+        "created_at": time.time(),
+    }
+    with open(os.path.join(target, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    pointer_tmp = os.path.join(root, "CURRENT.tmp")
+    with open(pointer_tmp, "w") as f:
+        f.write(name)
+    os.replace(pointer_tmp, os.path.join(root, "CURRENT"))
+
+    # Older snapshots stay mapped by any process that already loaded them;
+    # unlinking only drops the directory entries.
+    for entry in os.listdir(root):
+        if entry.startswith("snapshot-") and entry != name:
+            shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+
+    print(f"[snapshot] Saved {matrix.shape[0]} internships to {target}")
+    return target
+
+
+def current_name(root: str) -> Optional[str]:
+    """Name of the live snapshot directory under `root`, or None."""
+    try:
+        with open(os.path.join(root, "CURRENT")) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def load_snapshot(
+        root: str, name: Optional[str] = None
+        ) -> tuple[Optional[TFIDFRecommender], Optional[str]]:
+    """
+    Restores a recommender from the snapshot `name` under `root` (the
+    current one by default), with the large arrays memory-mapped
+    read-only. Returns (recommender, fingerprint), or (None, None) if
+    there is no usable snapshot.
+
+    Like a fitted one, the restored recommender holds no internship rows:
+    set its row_loader before calling recommend().
+    """
+    name = name or current_name(root)
+    if name is None:
+        return None, None
+    target = os.path.join(root, name)
+    try:
+        with open(os.path.join(target, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+
+    if meta.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        print(f"[snapshot] Ignoring {target}: format version mismatch")
+        return None, None
+
+    keys = list(_ARRAYS) + (list(_LSA_ARRAYS) if meta.get("lsa") else [])
+    try:
+        arrays = {
+            key: np.load(os.path.join(target, f"{key}.npy"), mmap_mode="r")
+            for key in keys
+        }
+    except (OSError, ValueError) as e:
+        print(f"[snapshot] Could not load {target}: {e}")
+        return None, None
+
+    recommender = create_recommender(
+        meta.get("engine", TFIDFRecommender.ENGINE),
+        lsa_dimensions=meta.get("lsa_dimensions") or 256,
+        matrix_dtype=meta.get("matrix_dtype", "float64"),
+        max_terms=meta.get("max_terms", 0),
+        )
+    terms = _unpack_strings(
+        arrays["vocabulary_blob"], arrays["vocabulary_offsets"]
+        )
+    recommender.vectorizer.vocabulary_ = {t: i for i, t in enumerate(terms)}
+    recommender.vectorizer.idf_ = np.asarray(arrays["idf"])
+    recommender.vocabulary_version = (
+        meta.get("vocabulary_version") or recommender._vocabulary_fingerprint()
+        )
+    recommender.internship_matrix = sparse.csr_matrix(
+        (arrays["data"], arrays["indices"], arrays["indptr"]),
+        shape=tuple(meta["shape"]),
+        copy=False,
+        )
+    recommender.internship_ids = arrays["internship_ids"]
+    recommender.internship_domain_masks = arrays["domain_masks"]
+    recommender._unique_titles = _unpack_strings(
+        arrays["title_blob"], arrays["title_offsets"]
+        )
+    recommender._title_codes = arrays["title_codes"]
+    recommender._extend_title_index([])
+    reason_terms = _unpack_strings(
+        arrays["reason_blob"], arrays["reason_offsets"]
+        )
+    recommender._reason_vocabulary = {t: i for i, t in enumerate(reason_terms)}
+    recommender._reason_index = sparse.csr_matrix(
+        (
+            np.ones(len(arrays["reason_indices"]), dtype=bool),
+            arrays["reason_indices"],
+            arrays["reason_indptr"],
+        ),
+        shape=(meta["shape"][0], len(reason_terms)),
+        copy=False,
+        )
+    recommender._locations = _unpack_strings(
+        arrays["location_blob"], arrays["location_offsets"]
+        )
+    recommender._location_codes = arrays["location_codes"]
+    recommender._sources = _unpack_strings(
+        arrays["source_blob"], arrays["source_offsets"]
+        )
+    recommender._source_codes = arrays["source_codes"]
+    recommender.internship_created_at = arrays["created_at"]
+    if meta.get("lsa"):
+        recommender.lsa_components = arrays["lsa_components"]
+        recommender.internship_embeddings = arrays["lsa_embeddings"]
+    recommender._fitted_size = meta["fitted_size"]
+    recommender._incremental_changes = meta["incremental_changes"]
+
+    print(f"[snapshot] Loaded {meta['shape'][0]} internships from {target}")
+    return recommender, meta["fingerprint"]
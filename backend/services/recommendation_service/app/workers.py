@@ -0,0 +1,154 @@
+# services/recommendation-service/app/workers.py
+#
+# Fixed-size worker pool for recommendation computations.
+#
+# Every uncached request used to start its own thread (and its own database
+# connection), so a burst of logins or a notification sweep could spawn
+# hundreds of them. Work now goes through a bounded priority queue drained
+# by a fixed number of threads: interactive requests are served before
+# background ones (warmups, batch sweeps), and submissions are rejected
+# with PoolSaturated once the queue is full, so the API can answer 429
+# instead of piling up work.
+
+import itertools
+import math
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from typing import Callable
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+_PRIORITY_STOP = 2  # sorts after all real work
+
+
+class PoolSaturated(Exception):
+    """Raised by submit() when the queue has no room for the job."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"worker pool saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ComputePool:
+    def __init__(
+            self,
+            workers: int = 4,
+            max_queue: int = 200,
+            background_share: float = 0.5,
+            ):
+        """
+        `max_queue` bounds jobs waiting for a worker. Background jobs are
+        only admitted while fewer than `background_share` * `max_queue`
+        jobs are waiting, so they cannot starve interactive requests of
+        queue space.
+        """
+        self._workers = max(1, workers)
+        self._max_queue = max(1, max_queue)
+        self._background_limit = max(1, int(self._max_queue * background_share))
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._pending = 0
+        self._running = 0
+        # Moving average of job duration, for Retry-After estimates.
+        self._avg_seconds = 1.0
+        self.completed = 0
+        self.rejected = 0
+
+    # --- Lifecycle ---
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self._workers):
+                t = threading.Thread(
+                    target=self._work, name=f"rec-worker-{i}", daemon=True
+                )
+                t.start()
+                self._threads.append(t)
+
+    def stop(self):
+        """Lets workers finish queued jobs, then exits them."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put((_PRIORITY_STOP, next(self._seq), None, None, ()))
+
+    # --- Submission ---
+
+    def retry_after(self) -> int:
+        """Rough seconds until the current backlog has drained."""
+        with self._lock:
+            backlog = self._pending + self._running
+            return max(1, math.ceil(backlog * self._avg_seconds / self._workers))
+
+    def submit(
+            self,
+            fn: Callable,
+            *args,
+            priority: int = PRIORITY_INTERACTIVE,
+            ) -> Future:
+        """
+        Queues fn(*args) and returns a Future for its result. Raises
+        PoolSaturated if the queue is full for this priority.
+        """
+        limit = (
+            self._max_queue if priority == PRIORITY_INTERACTIVE
+            else self._background_limit
+        )
+        with self._lock:
+            saturated = self._pending >= limit
+            if saturated:
+                self.rejected += 1
+            else:
+                self._pending += 1
+        if saturated:
+            raise PoolSaturated(self.retry_after())
+
+        self.start()
+        future: Future = Future()
+        self._queue.put((priority, next(self._seq), future, fn, args))
+        return future
+
+    # --- Workers ---
+
+    def _work(self):
+        while True:
+            priority, _, future, fn, args = self._queue.get()
+            if priority == _PRIORITY_STOP:
+                return
+            with self._lock:
+                self._pending -= 1
+                self._running += 1
+            started = time.monotonic()
+            try:
+                if future.set_running_or_notify_cancel():
+                    future.set_result(fn(*args))
+            except Exception as e:
+                print(f"[workers] Job {getattr(fn, '__name__', fn)} failed: {e}")
+                traceback.print_exc()
+                future.set_exception(e)
+            finally:
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self._running -= 1
+                    self.completed += 1
+                    self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self._workers,
+                "max_queue": self._max_queue,
+                "queued": self._pending,
+                "running": self._running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_job_seconds": round(self._avg_seconds, 3),
+            }
+
@@ -0,0 +1,12 @@
+# services/recommendation-service/benchmark
+#
+# Synthetic-corpus benchmark for the recommender. Generates internships and
+# student profiles (see synthetic.py), fits the model at each requested
+# corpus size and records fit time, per-request latency percentiles, batch
+# throughput and peak RSS as JSON, so results can be compared between
+# commits. From backend/:
+#
+#   python -m services.recommendation_service.benchmark \
+#       --sizes 1000,10000,100000 --out bench.json
+#   python -m services.recommendation_service.benchmark \
+#       --sizes 1000,10000,100000 --compare bench.json
@@ -0,0 +1,177 @@
+# services/recommendation-service/benchmark/__main__.py
+#
+# Command-line entry point; see the package docstring for usage.
+#
+# Each corpus size runs in its own spawned process, so the peak RSS it
+# reports belongs to that size alone and one size's garbage does not skew
+# the next size's timings.
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .runner import run_size
+
+# Metrics compared by --compare; all are "lower is better" except
+# throughput, which is inverted before comparing.
+_COMPARED = [
+    "fit_seconds",
+    "cold_latency_ms.p50", "cold_latency_ms.p99",
+    "warm_latency_ms.p50", "warm_latency_ms.p99",
+    "batch_students_per_second",
+    "matrix_mb",
+    "peak_rss_mb",
+]
+
+
+def _environment() -> dict:
+    import scipy
+    import sklearn
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def _metric(result: dict, name: str) -> float | None:
+    """Value of a dotted metric name, or None if the run lacks it."""
+    value = result
+    for part in name.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return None if value is None else float(value)
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """
+    Prints metric ratios against `baseline` for the sizes both runs share,
+    and returns the metrics that got worse by more than `threshold`.
+    """
+    previous = {r["internships"]: r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get(result["internships"])
+        if old is None:
+            continue
+        print(f"[benchmark] {result['internships']} internships vs "
+              f"{baseline['environment'].get('commit')}:")
+        for name in _COMPARED:
+            before, after = _metric(old, name), _metric(result, name)
+            if before is None or after is None or before <= 0 or after <= 0:
+                continue
+            # ratio > 1 means worse, for every metric
+            ratio = before / after if name == "batch_students_per_second" else after / before
+            flag = "  REGRESSION" if ratio > threshold else ""
+            print(f"    {name:28s} {before:>12g} -> {after:<12g} x{ratio:.2f}{flag}")
+            if flag:
+                regressions.append(f"{result['internships']}:{name}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the recommender on synthetic corpora"
+    )
+    parser.add_argument(
+        "--sizes", default="1000,10000,100000",
+        help="comma-separated internship counts (up to 1000000)",
+    )
+    parser.add_argument("--engine", default="tfidf", choices=["tfidf", "lsa"])
+    parser.add_argument("--lsa-dimensions", type=int, default=256)
+    parser.add_argument(
+        "--matrix-dtype", default="float64", choices=["float64", "float32"],
+    )
+    parser.add_argument(
+        "--max-terms", type=int, default=0,
+        help="keep only this many terms per internship (0 keeps all)",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=500,
+        help="student profiles scored per size",
+    )
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument(
+        "--threshold", type=float, default=1.25,
+        help="ratio above which --compare reports a regression",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    results = []
+    spawn = multiprocessing.get_context("spawn")
+    for size in sizes:
+        print(f"[benchmark] {size} internships ({args.engine})...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            result = pool.submit(
+                run_size, size, args.engine, args.lsa_dimensions,
+                args.requests, args.batch_size, args.seed,
+                args.matrix_dtype, args.max_terms,
+            ).result()
+        print(f"[benchmark]   fit {result['fit_seconds']}s, "
+              f"warm p50 {result['warm_latency_ms']['p50']}ms "
+              f"p99 {result['warm_latency_ms']['p99']}ms, "
+              f"batch {result['batch_students_per_second']} students/s, "
+              f"peak RSS {result['peak_rss_mb']} MB, "
+              f"matrix {result['matrix_mb']} MB")
+        if result["full_matrix_mb"] is not None:
+            print(f"[benchmark]   full matrix {result['full_matrix_mb']} MB, "
+                  f"top-10 overlap {result['ranking_overlap_at_10']:.1%}")
+        results.append(result)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": _environment(),
+        "config": {
+            "engine": args.engine,
+            "lsa_dimensions": args.lsa_dimensions,
+            "matrix_dtype": args.matrix_dtype,
+            "max_terms": args.max_terms,
+            "requests": args.requests,
+            "batch_size": args.batch_size,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[benchmark] Results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"[benchmark] Regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# services/recommendation-service/benchmark/runner.py
+#
+# Measurements for one corpus size. Kept apart from __main__ so spawned
+# worker processes can import run_size().
+
+import contextlib
+import os
+import resource
+import sys
+import time
+
+# The recommender imports the shared models, which read the database
+# settings at import time. The benchmark never connects.
+os.environ.setdefault("DATABASE_PASSWORD", "benchmark")
+
+import numpy as np
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _percentiles(seconds: list[float]) -> dict:
+    ms = np.asarray(seconds) * 1000.0
+    return {
+        "p50": round(float(np.percentile(ms, 50)), 3),
+        "p90": round(float(np.percentile(ms, 90)), 3),
+        "p99": round(float(np.percentile(ms, 99)), 3),
+        "mean": round(float(ms.mean()), 3),
+        "max": round(float(ms.max()), 3),
+    }
+
+
+def _matrix_mb(matrix) -> float:
+    if matrix is None:
+        return 0.0
+    size = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    return round(size / (1024 * 1024), 2)
+
+
+def _ranking_overlap(model, reference, students, top_n: int = 10) -> float:
+    """Mean share of `reference`'s top_n that `model` also returns."""
+    shares = []
+    for student in students:
+        expected = {i for i, _ in reference.rank(student, top_k=top_n)}
+        if expected:
+            found = {i for i, _ in model.rank(student, top_k=top_n)}
+            shares.append(len(found & expected) / len(expected))
+    return round(float(np.mean(shares)), 4) if shares else 1.0
+
+
+def run_size(
+        size: int,
+        engine: str,
+        lsa_dimensions: int,
+        requests: int,
+        batch_size: int,
+        seed: int,
+        matrix_dtype: str = "float64",
+        max_terms: int = 0,
+        ) -> dict:
+    """
+    Benchmarks one corpus size. Runs in a fresh process. With a compact
+    matrix storage, a default-storage model is fitted afterwards to
+    report the memory saved and how much of its top 10 is kept.
+    """
+    from ..app.core import create_recommender
+    from .synthetic import make_internships, make_students
+
+    started = time.perf_counter()
+    internships = make_internships(size, seed=seed)
+    students = make_students(requests, seed=seed + 1)
+    generate_seconds = time.perf_counter() - started
+    corpus_rss = _rss_mb()
+
+    recommender = create_recommender(
+        engine, lsa_dimensions=lsa_dimensions,
+        matrix_dtype=matrix_dtype, max_terms=max_terms,
+        )
+    started = time.perf_counter()
+    recommender.fit(internships)
+    fit_seconds = time.perf_counter() - started
+    fit_rss = _rss_mb()
+
+    # Rows are hydrated by id at response time; this dict stands in for
+    # the database.
+    by_id = {i.id: i for i in internships}
+    recommender.row_loader = lambda ids: [by_id[i] for i in ids if i in by_id]
+
+    # recommend() logs every result; keep that out of the output but
+    # inside the measured time, as in the service.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        # First request per profile vectorizes it; the repeat hits the
+        # student-vector cache.
+        cold, warm = [], []
+        for timings in (cold, warm):
+            for student in students:
+                t = time.perf_counter()
+                recommender.recommend(student, top_n=10)
+                timings.append(time.perf_counter() - t)
+
+        started = time.perf_counter()
+        for start in range(0, len(students), batch_size):
+            recommender.recommend_many(students[start:start + batch_size], top_n=10)
+        batch_seconds = time.perf_counter() - started
+
+    peak_rss = _rss_mb()
+
+    full_matrix_mb = overlap = None
+    reference = create_recommender(engine, lsa_dimensions=lsa_dimensions)
+    if recommender.variant() != reference.variant():
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            reference.fit(internships)
+        full_matrix_mb = _matrix_mb(reference.internship_matrix)
+        overlap = _ranking_overlap(recommender, reference, students)
+
+    matrix = recommender.internship_matrix
+    return {
+        "internships": size,
+        "engine": engine,
+        "variant": recommender.variant(),
+        "vocabulary": len(recommender.vectorizer.vocabulary_),
+        "matrix_nnz": int(matrix.nnz) if matrix is not None else 0,
+        "matrix_mb": _matrix_mb(matrix),
+        "full_matrix_mb": full_matrix_mb,
+        "ranking_overlap_at_10": overlap,
+        "generate_seconds": round(generate_seconds, 3),
+        "fit_seconds": round(fit_seconds, 3),
+        "cold_latency_ms": _percentiles(cold),
+        "warm_latency_ms": _percentiles(warm),
+        "batch_size": batch_size,
+        "batch_students_per_second": round(len(students) / batch_seconds, 1),
+        "corpus_rss_mb": corpus_rss,
+        "fit_rss_mb": fit_rss,
+        "peak_rss_mb": peak_rss,
+    }
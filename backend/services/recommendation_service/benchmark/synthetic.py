@@ -0,0 +1,222 @@
+# services/recommendation-service/benchmark/synthetic.py
+#
+# Deterministic synthetic internships and student profiles for benchmarks.
+#
+# Postings mix several domains and carry HTML descriptions shaped like the
+# ones the crawler stores (LinkedIn/Seek markup with paragraphs and bullet
+# lists). Description words are drawn from a Zipf-like distribution over a
+# vocabulary that grows with the corpus, so the TF-IDF matrix gets the long
+# tail of rare terms a real corpus has.
+#
+# Objects are plain attribute holders with the fields the recommender
+# reads, so generating a million of them needs no database and no ORM.
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+DOMAINS: dict[str, dict[str, list[str]]] = {
+    "tech": {
+        "titles": [
+            "Software Engineer Intern", "Frontend Developer Intern",
+            "Backend Developer Intern", "Full Stack Developer Intern",
+            "Data Science Intern", "Machine Learning Intern",
+            "DevOps Engineer Intern", "Cybersecurity Analyst Intern",
+            "QA Engineer Intern", "Mobile Developer Intern",
+        ],
+        "words": [
+            "python", "java", "javascript", "typescript", "react", "node",
+            "cloud", "aws", "docker", "kubernetes", "api", "database", "sql",
+            "microservices", "testing", "agile", "git", "linux", "security",
+            "data", "pipeline", "analytics", "frontend", "backend", "mobile",
+            "android", "ios", "machine", "learning", "model", "deployment",
+        ],
+        "roles": [
+            "Frontend Developer", "Backend Developer", "Software Engineer",
+            "Data Scientist", "Machine Learning Engineer", "DevOps Engineer",
+        ],
+        "majors": ["Computer Science", "Software Engineering", "Data Science"],
+    },
+    "pharmacy": {
+        "titles": [
+            "Pharmacy Intern", "Intern Pharmacist", "Pharmacy Assistant Intern",
+            "Clinical Pharmacy Intern",
+        ],
+        "words": [
+            "pharmacy", "pharmacist", "dispensing", "medication", "patients",
+            "compounding", "prescriptions", "counselling", "clinical",
+            "community", "hospital", "pharmaceutical", "dosage", "safety",
+        ],
+        "roles": ["Pharmacist", "Clinical Pharmacist"],
+        "majors": ["Pharmacy", "Pharmaceutical Science"],
+    },
+    "finance": {
+        "titles": [
+            "Finance Intern", "Investment Banking Intern", "Audit Intern",
+            "Tax Intern", "Accounting Graduate Intern",
+        ],
+        "words": [
+            "finance", "financial", "accounting", "audit", "tax", "banking",
+            "investment", "equity", "valuation", "excel", "reporting",
+            "treasury", "risk", "compliance", "portfolio", "markets",
+        ],
+        "roles": ["Financial Analyst", "Accountant", "Investment Analyst"],
+        "majors": ["Finance", "Accounting", "Economics"],
+    },
+    "marketing": {
+        "titles": [
+            "Marketing Intern", "Digital Marketing Intern",
+            "Social Media Intern", "Brand Assistant Intern",
+        ],
+        "words": [
+            "marketing", "brand", "campaigns", "social", "media", "seo",
+            "content", "advertising", "analytics", "communications",
+            "audience", "engagement", "copywriting", "strategy",
+        ],
+        "roles": ["Marketing Coordinator", "Digital Marketer"],
+        "majors": ["Marketing", "Communications"],
+    },
+    "engineering": {
+        "titles": [
+            "Mechanical Engineering Intern", "Civil Engineering Intern",
+            "Electrical Engineering Intern", "Structural Engineering Intern",
+        ],
+        "words": [
+            "mechanical", "civil", "electrical", "structural", "cad",
+            "design", "manufacturing", "construction", "site", "drawings",
+            "autocad", "solidworks", "safety", "projects", "embedded",
+        ],
+        "roles": ["Mechanical Engineer", "Civil Engineer", "Electrical Engineer"],
+        "majors": ["Mechanical Engineering", "Civil Engineering"],
+    },
+    "medical": {
+        "titles": [
+            "Clinical Research Intern", "Nursing Intern",
+            "Healthcare Administration Intern",
+        ],
+        "words": [
+            "clinical", "healthcare", "nursing", "patients", "hospital",
+            "medical", "research", "care", "records", "trials", "wellbeing",
+        ],
+        "roles": ["Nurse", "Clinical Researcher"],
+        "majors": ["Nursing", "Biomedical Science"],
+    },
+}
+
+# Share of postings per domain, roughly what the crawler sees.
+DOMAIN_WEIGHTS = {
+    "tech": 0.45, "finance": 0.15, "marketing": 0.12,
+    "engineering": 0.12, "pharmacy": 0.08, "medical": 0.08,
+}
+
+COMMON_WORDS = [
+    "team", "work", "experience", "opportunity", "students", "graduate",
+    "internship", "program", "skills", "support", "develop", "learn",
+    "communication", "stakeholders", "business", "role", "environment",
+    "collaborate", "growth", "mentoring", "flexible", "hybrid", "office",
+    "customers", "solutions", "deliver", "quality", "innovative", "company",
+]
+
+LOCATIONS = [
+    "Sydney NSW", "Melbourne VIC", "Brisbane QLD", "Perth WA",
+    "Adelaide SA", "Canberra ACT", "Hobart TAS", "Remote",
+]
+SOURCES = ["LinkedIn", "Seek"]
+
+
+def _zipf_probabilities(size: int, exponent: float = 1.1) -> np.ndarray:
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _rare_vocabulary(n_internships: int) -> list[str]:
+    """Long-tail terms (tools, product and company names); grows with n."""
+    size = max(500, int(20 * n_internships ** 0.6))
+    return [f"term{i}" for i in range(size)]
+
+
+def _description_html(paragraphs: list[str], bullets: list[str], source: str) -> str:
+    body = "".join(f"<p>{p}</p>" for p in paragraphs)
+    items = "".join(f"<li>{b}</li>" for b in bullets)
+    if source == "LinkedIn":
+        return (
+            '<div class="show-more-less-html__markup">'
+            f"{body}<strong>Requirements</strong><ul>{items}</ul></div>"
+        )
+    return (
+        '<div data-automation="jobAdDetails">'
+        f"{body}<h3>About you</h3><ul>{items}</ul></div>"
+    )
+
+
+def make_internships(
+        n: int, seed: int = 0, words_per_posting: int = 150
+        ) -> list[SimpleNamespace]:
+    """`n` synthetic postings with ids 1..n, created over the last 90 days."""
+    rng = np.random.default_rng(seed)
+    domains = list(DOMAIN_WEIGHTS)
+    domain_of = rng.choice(
+        len(domains), size=n, p=[DOMAIN_WEIGHTS[d] for d in domains]
+    )
+    rare = _rare_vocabulary(n)
+    rare_p = _zipf_probabilities(len(rare))
+    now = datetime.now(timezone.utc)
+
+    internships = []
+    for i in range(n):
+        domain = DOMAINS[domains[domain_of[i]]]
+        source = SOURCES[i % len(SOURCES)]
+        # A description is a mix of domain terms, filler and rare terms.
+        n_domain = words_per_posting // 3
+        n_rare = words_per_posting // 6
+        words = (
+            list(rng.choice(domain["words"], size=n_domain))
+            + list(rng.choice(COMMON_WORDS, size=words_per_posting - n_domain - n_rare))
+            + [rare[j] for j in rng.choice(len(rare), size=n_rare, p=rare_p)]
+        )
+        rng.shuffle(words)
+        cut = len(words) * 2 // 3
+        paragraphs = [" ".join(words[k:k + 25]) for k in range(0, cut, 25)]
+        bullets = [" ".join(words[k:k + 8]) for k in range(cut, len(words), 8)]
+        internships.append(SimpleNamespace(
+            id=i + 1,
+            title=str(rng.choice(domain["titles"])),
+            company=f"Company {int(rng.integers(1, max(2, n // 20)))}",
+            description=_description_html(paragraphs, bullets, source),
+            location=LOCATIONS[int(rng.integers(len(LOCATIONS)))],
+            url=f"https://jobs.example.com/{i + 1}",
+            source=source,
+            created_at=now - timedelta(minutes=int(rng.integers(0, 90 * 24 * 60))),
+        ))
+    return internships
+
+
+def make_students(n: int, seed: int = 1) -> list[SimpleNamespace]:
+    """`n` synthetic student profiles across the same domains."""
+    rng = np.random.default_rng(seed)
+    domains = list(DOMAIN_WEIGHTS)
+    students = []
+    for i in range(n):
+        domain = DOMAINS[domains[int(rng.integers(len(domains)))]]
+        words = list(rng.choice(domain["words"], size=10, replace=False))
+        has_keywords = rng.random() < 0.7
+        students.append(SimpleNamespace(
+            id=i + 1,
+            preferred_job_role=str(rng.choice(domain["roles"])) if rng.random() < 0.85 else None,
+            search_keywords=", ".join(words[:6]) if has_keywords else None,
+            major=str(rng.choice(domain["majors"])),
+            summary=f"{rng.choice(domain['majors'])} student interested in "
+                    + " ".join(words[6:]),
+            skills=[SimpleNamespace(name=w) for w in words[:int(rng.integers(2, 8))]],
+            projects=[
+                SimpleNamespace(
+                    title=f"{words[j].title()} project",
+                    technologies_used=", ".join(words[j:j + 3]),
+                    description=" ".join(rng.choice(domain["words"], size=20)),
+                )
+                for j in range(int(rng.integers(0, 3)))
+            ],
+            profile_version=0,
+        ))
+    return students
@@ -59,6 +59,18 @@ def delete_student(db: Session, student_id: int):
     return db_student
 
 
+def bump_profile_version(db: Session, student_id: int):
+    """
+    Marks the student's profile as changed so the recommendation service
+    drops its cached results. Runs as an atomic SQL increment; the caller
+    commits.
+    """
+    db.query(models.Student).filter(models.Student.id == student_id).update(
+        {models.Student.profile_version: models.Student.profile_version + 1},
+        synchronize_session=False
+    )
+
+
 def get_or_create_skill(db: Session, skill: schemas.SkillCreate):
     """Finds a skill by name or creates it if it doesn't exist."""
     db_skill = db.query(
@@ -91,6 +103,7 @@ def add_skill_to_student(
 
     # Add the new skill
     db_student.skills.append(db_skill)
+    bump_profile_version(db, student_id)
     db.commit()
     db.refresh(db_student)
     return db_student
@@ -114,6 +127,7 @@ def add_project_to_student(
         ):
     db_project = models.Project(**project.dict(), student_id=student_id)
     db.add(db_project)
+    bump_profile_version(db, student_id)
     db.commit()
     db.refresh(db_project)
     return db_project
@@ -163,6 +177,7 @@ def enrich_student_profile(db: Session, student_id: int):
     if summary:
         student.summary = summary
         db.add(student)
+        bump_profile_version(db, student_id)
         db.commit()
         db.refresh(student)
 
@@ -339,6 +354,7 @@ def update_student(db: Session, student_id: int, student_update: schemas.Student
             print(f"❌ LLM Error: {e}")
 
     db.add(db_student)
+    bump_profile_version(db, student_id)
     db.commit()
     db.refresh(db_student)
     return db_student
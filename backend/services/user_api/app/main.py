@@ -34,6 +34,12 @@ with engine.connect() as _conn:
             "ALTER TABLE students ADD COLUMN IF NOT EXISTS resume_s3_url TEXT;"
         )
     )
+    _conn.execute(
+        __import__("sqlalchemy").text(
+            "ALTER TABLE students ADD COLUMN IF NOT EXISTS "
+            "profile_version INTEGER NOT NULL DEFAULT 0;"
+        )
+    )
     _conn.commit()
 
 app = FastAPI(
@@ -622,7 +628,8 @@ def check_for_new_job_notifications(
     try:
         response = http_requests.get(
             f"{rec_url}/recommendations/{current_user.id}",
-            timeout=10
+            params={"wait": 8, "priority": "background", "reasons": "false"},
+            timeout=15
         )
         if response.status_code != 200:
             return []
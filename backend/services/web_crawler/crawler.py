@@ -1,4 +1,5 @@
 import os
+import sys
 import time
 import random
 import psycopg2
@@ -8,8 +9,17 @@ from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from bs4 import BeautifulSoup
 import urllib.parse
+import urllib.request
 from typing import Optional
 
+# shared/ sits next to services/; make it importable when this file is run
+# directly as a script.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from shared.core.keywords import KeywordMatcher
+from shared.core.dedup import (
+    NearDuplicateIndex, decode_signature, encode_signature, posting_signature,
+)
+
 load_dotenv()
 
 # --- DATABASE CONFIGURATION ---
@@ -28,6 +38,12 @@ if db_config["host"] not in {"localhost", "127.0.0.1"}:
 SEARCH_QUERY = "Data Science Internship"
 LOCATION = "Australia"
 LIMIT_PER_SOURCE = int(os.getenv("CRAWLER_LIMIT_PER_SOURCE", "10"))
+RECOMMENDATION_SERVICE_URL = os.getenv("RECOMMENDATION_SERVICE_URL", "http://localhost:8002")
+# New postings are checked for near-duplicates against canonical postings
+# stored in the last DEDUP_WINDOW_DAYS days (0 checks the whole table).
+# Cross-posted and recrawled copies of a job show up close together, and
+# the window keeps the per-crawl signature work bounded.
+DEDUP_WINDOW_DAYS = int(os.getenv("CRAWLER_DEDUP_WINDOW_DAYS", "60"))
 
 DOMAIN_HINTS = {
     "pharmacy": ["pharmacy", "pharmacist", "pharmacology"],
@@ -49,6 +65,8 @@ DOMAIN_HINTS = {
     "legal": ["legal", "law", "compliance", "policy"],
     "health": ["health", "nursing", "biomedical", "clinical"],
 }
+# Whole-word matching; the first domain in DOMAIN_HINTS order wins.
+DOMAIN_HINT_MATCHER = KeywordMatcher(DOMAIN_HINTS)
 
 
 def setup_driver():
@@ -79,14 +97,10 @@ def infer_domain(
     major: Optional[str],
     keywords: Optional[str],
 ) -> Optional[str]:
-    haystack = " ".join(filter(None, [role, major, keywords])).lower()
+    haystack = " ".join(filter(None, [role, major, keywords]))
     if not haystack:
         return None
-
-    for domain, hints in DOMAIN_HINTS.items():
-        if any(hint in haystack for hint in hints):
-            return domain
-    return None
+    return DOMAIN_HINT_MATCHER.first_group(haystack)
 
 
 def build_search_query(
@@ -148,46 +162,162 @@ def create_table(conn):
                 url VARCHAR(500) UNIQUE NOT NULL,
                 source VARCHAR(50),
                 description TEXT,  -- Added description column
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                duplicate_of INTEGER REFERENCES internships(id),
+                minhash BYTEA
             );
         """)
+        # Tables created before in-place edits were tracked / before
+        # near-duplicate detection
+        cur.execute(
+            "ALTER TABLE internships ADD COLUMN IF NOT EXISTS "
+            "updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;"
+        )
+        cur.execute(
+            "ALTER TABLE internships ADD COLUMN IF NOT EXISTS "
+            "duplicate_of INTEGER REFERENCES internships(id);"
+        )
+        cur.execute("ALTER TABLE internships ADD COLUMN IF NOT EXISTS minhash BYTEA;")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS ix_internships_duplicate_of "
+            "ON internships (duplicate_of);"
+        )
         conn.commit()
     print("Table 'internships' is ready.")
 
 
+def canonical_signatures(conn, window_days=0):
+    """
+    (id, signature) of the canonical postings stored in the last
+    `window_days` days (all of them if 0), oldest first, read from the
+    minhash column. Postings stored before signatures were kept get
+    theirs computed and saved here, once.
+    """
+    where = "duplicate_of IS NULL"
+    params = ()
+    if window_days > 0:
+        where += " AND created_at >= NOW() - make_interval(days => %s)"
+        params = (window_days,)
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT id, title, company, description FROM internships
+            WHERE {where} AND minhash IS NULL ORDER BY id;
+        """, params)
+        missing = cur.fetchall()
+        for internship_id, title, company, description in missing:
+            cur.execute(
+                "UPDATE internships SET minhash = %s WHERE id = %s;",
+                (encode_signature(posting_signature(title, company, description)), internship_id),
+            )
+        conn.commit()
+        if missing:
+            print(f"Computed signatures for {len(missing)} stored postings.")
+
+        cur.execute(f"SELECT id, minhash FROM internships WHERE {where} ORDER BY id;", params)
+        return [(internship_id, decode_signature(minhash)) for internship_id, minhash in cur]
+
+
+def load_duplicate_index(conn, window_days=DEDUP_WINDOW_DAYS):
+    """
+    Builds a NearDuplicateIndex over the canonical postings stored in the
+    last `window_days` days (all of them if 0), keyed by internship id.
+    """
+    index = NearDuplicateIndex()
+    for internship_id, signature in canonical_signatures(conn, window_days):
+        index.add(internship_id, signature)
+    return index
+
+
 def insert_internships(conn, internships_list):
     """
     Insert a list of internships into the database.
-    Updates description if the URL already exists.
+    Updates description if the URL already exists. A new posting that is a
+    near-duplicate of a stored one (the same job from the other source, or
+    a recrawl under a new URL) is stored with duplicate_of pointing at it,
+    so the recommendation service indexes each job once.
     """
     if not internships_list:
         return 0
 
     print(f"Inserting {len(internships_list)} internships...")
-    count = 0
+    index = load_duplicate_index(conn)
+    count = duplicates = 0
     with conn.cursor() as cur:
         for job in internships_list:
             # Unwrap tuple
             title, company, location, url, source, description = job
-            
+            signature = posting_signature(title, company, description)
+            duplicate_of = index.find(signature)
+
             try:
+                # duplicate_of is only set on insert: a URL seen before keeps
+                # its place in (or out of) the cluster it already has.
                 cur.execute("""
-                    INSERT INTO internships (title, company, location, url, source, description)
-                    VALUES (%s, %s, %s, %s, %s, %s)
+                    INSERT INTO internships (title, company, location, url, source, description, duplicate_of, minhash)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                     ON CONFLICT (url) 
                     DO UPDATE SET 
                         description = EXCLUDED.description,
-                        title = EXCLUDED.title;
-                """, (title, company, location, url, source, description))
+                        title = EXCLUDED.title,
+                        minhash = EXCLUDED.minhash,
+                        -- Only a real edit makes the recommender re-index the row
+                        updated_at = CASE
+                            WHEN internships.description IS DISTINCT FROM EXCLUDED.description
+                              OR internships.title IS DISTINCT FROM EXCLUDED.title
+                            THEN CURRENT_TIMESTAMP
+                            ELSE internships.updated_at
+                        END
+                    RETURNING id, duplicate_of;
+                """, (title, company, location, url, source, description, duplicate_of,
+                      encode_signature(signature)))
+                internship_id, stored_duplicate_of = cur.fetchone()
+                # Commit per row: a later failure rolls back only its own row,
+                # and the index must only hold ids that were actually stored.
+                conn.commit()
                 count += 1
             except Exception as e:
                 print(f"Error inserting {title}: {e}")
                 conn.rollback() 
                 continue
-                
-        conn.commit()
+
+            if stored_duplicate_of is None:
+                # Canonical (new, or an existing canonical row updated in
+                # place); later postings in this batch can cluster under it.
+                index.add(internship_id, signature)
+            else:
+                duplicates += 1
+
+    if duplicates:
+        print(f"{duplicates} of them are near-duplicates of other postings.")
     return count
 
+
+def backfill_duplicates(conn):
+    """
+    Clusters the postings already stored, computing any missing
+    signatures. Canonical postings are visited oldest first; each one that
+    duplicates an earlier canonical posting is marked with duplicate_of.
+    Safe to re-run.
+    """
+    index = NearDuplicateIndex()
+    marked = 0
+    signatures = canonical_signatures(conn)
+    with conn.cursor() as cur:
+        for internship_id, signature in signatures:
+            canonical = index.find(signature)
+            if canonical is None:
+                index.add(internship_id, signature)
+                continue
+            cur.execute(
+                "UPDATE internships SET duplicate_of = %s WHERE id = %s;",
+                (canonical, internship_id),
+            )
+            marked += 1
+        conn.commit()
+    print(f"Marked {marked} near-duplicate postings ({len(index)} canonical).")
+    return marked
+
 # --- HELPER: Extract Description from a single URL ---
 def get_job_description(driver, url, source):
     """Visits the job URL and scrapes the full description."""
@@ -313,6 +443,21 @@ def scrape_seek(driver, query, location, limit_per_source=10):
 
     return internships_data
 
+def notify_recommendation_service():
+    """
+    Asks the recommendation service to index the rows we just inserted.
+    Best effort: if the service is down it will pick them up on its next fit.
+    """
+    request = urllib.request.Request(
+        f"{RECOMMENDATION_SERVICE_URL}/internships/sync", method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            print(f"Recommendation index synced: {response.read().decode()}")
+    except Exception as e:
+        print(f"Could not sync recommendation index: {e}")
+
+
 def run_crawl(conn, queries, location, limit_per_source):
     all_internships = []
     driver = setup_driver()
@@ -344,6 +489,8 @@ def run_crawl(conn, queries, location, limit_per_source):
     print(f"\nTotal internships scraped: {len(all_internships)}")
     inserted_count = insert_internships(conn, all_internships)
     print(f"Successfully processed {inserted_count} internships.")
+    if inserted_count:
+        notify_recommendation_service()
 
 
 def parse_args():
@@ -353,6 +500,8 @@ def parse_args():
                         help="Search query (can be repeated for multiple queries, e.g. --query Pharmacy --query 'Data Science')")
     parser.add_argument("--location", default=LOCATION)
     parser.add_argument("--limit-per-source", type=int, default=LIMIT_PER_SOURCE)
+    parser.add_argument("--backfill-duplicates", action="store_true",
+                        help="Store missing signatures, mark near-duplicates among stored postings and exit without crawling")
     return parser.parse_args()
 
 
@@ -366,6 +515,11 @@ def main():
     try:
         create_table(conn)
 
+        if args.backfill_duplicates:
+            if backfill_duplicates(conn):
+                notify_recommendation_service()
+            return
+
         if args.mode == "users":
             queries = get_target_queries_from_students(conn)
         else:
@@ -0,0 +1,146 @@
+# shared/core/dedup.py
+#
+# Near-duplicate detection for internship postings, shared by the crawler
+# (which clusters postings as it stores them) and anything that needs to
+# compare postings offline.
+#
+# The same posting often appears on both LinkedIn and Seek, or comes back
+# from a recrawl under a new URL with slightly different markup. Exact URL
+# matching misses these, so postings are compared by content: title,
+# company and description are stripped of HTML, split into words and cut
+# into overlapping word shingles, and a MinHash signature estimates the
+# Jaccard similarity of two postings' shingle sets. Signatures are indexed
+# with LSH (locality-sensitive hashing) bands, so finding the duplicates of
+# a posting touches only the few postings that share a band with it, not
+# the whole table.
+#
+# Signatures are stored with each posting (see encode_signature()), so a
+# crawl only computes them for the postings it scrapes.
+#
+# Pure Python (no numpy), so the crawler needs no extra dependency.
+
+import html
+import random
+import re
+import struct
+import zlib
+from typing import Hashable, Optional
+
+NUM_PERM = 128
+# 32 bands of 4 rows: postings with a similarity around 0.7 share a band
+# with near certainty; candidates are then checked against `threshold`.
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# Postings with fewer shingles than this (e.g. "No description available.")
+# carry too little text to compare and are never treated as duplicates.
+MIN_SHINGLES = 10
+DEFAULT_THRESHOLD = 0.7
+
+_TAG = re.compile(r"<[^>]+>")
+_WORD = re.compile(r"[a-z0-9]+")
+# Universal hashing (a*x + b) mod p over 32-bit shingle hashes. Fixed seed,
+# so signatures computed by different processes and runs are comparable.
+_PRIME = 4294967311  # smallest prime above 2**32
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)
+]
+
+Signature = tuple[int, ...]
+
+
+def normalize_posting(
+        title: Optional[str],
+        company: Optional[str],
+        description: Optional[str],
+        ) -> list[str]:
+    """The posting's words, lower-cased, with HTML tags and entities removed."""
+    text = " ".join(filter(None, [title, company, description]))
+    text = html.unescape(_TAG.sub(" ", text))
+    return _WORD.findall(text.lower())
+
+
+def posting_signature(
+        title: Optional[str],
+        company: Optional[str],
+        description: Optional[str],
+        ) -> Optional[Signature]:
+    """MinHash signature of a posting, or None if it is too short to compare."""
+    words = normalize_posting(title, company, description)
+    shingles = {
+        " ".join(words[i:i + SHINGLE_SIZE])
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    # Masked to 32 bits so a signature packs into NUM_PERM * 4 bytes. A
+    # minimum over many values below _PRIME is below 2**32 in practice.
+    return tuple(
+        min([(a * h + b) % _PRIME for h in hashes]) & 0xFFFFFFFF
+        for a, b in _PERMUTATIONS
+    )
+
+
+_PACKED = struct.Struct(f"<{NUM_PERM}I")
+
+
+def encode_signature(signature: Optional[Signature]) -> bytes:
+    """Signature as stored in internships.minhash; b"" for no signature."""
+    return _PACKED.pack(*signature) if signature is not None else b""
+
+
+def decode_signature(data: Optional[bytes]) -> Optional[Signature]:
+    """Inverse of encode_signature()."""
+    return _PACKED.unpack(bytes(data)) if data else None
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of the postings behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of canonical postings. find() returns the canonical posting
+    a new one duplicates; a posting that duplicates nothing is add()ed and
+    becomes canonical itself, so each cluster has exactly one entry here.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._signatures: dict[Hashable, Signature] = {}
+        self._buckets: list[dict[Signature, list[Hashable]]] = [
+            {} for _ in range(BANDS)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    @staticmethod
+    def _bands(signature: Signature):
+        for band in range(BANDS):
+            yield band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+
+    def find(self, signature: Optional[Signature]) -> Optional[Hashable]:
+        """Key of the most similar canonical posting at or above the threshold."""
+        if signature is None:
+            return None
+        candidates = set()
+        for band, key in self._bands(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        best, best_score = None, self.threshold
+        for candidate in candidates:
+            score = similarity(signature, self._signatures[candidate])
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def add(self, key: Hashable, signature: Optional[Signature]):
+        """Indexes a canonical posting. Postings without a signature are skipped."""
+        if signature is None:
+            return
+        self._signatures[key] = signature
+        for band, band_key in self._bands(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
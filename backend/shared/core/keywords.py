@@ -0,0 +1,96 @@
+# shared/core/keywords.py
+#
+# Multi-keyword matching for domain and role detection, shared by the
+# recommendation service and the crawler.
+#
+# A KeywordMatcher is built once from keyword groups. Matching splits the
+# text into words in a single regex pass and looks them up in hash sets,
+# so the cost depends on the text length, not on how many keywords there
+# are. Keywords match whole words only ("it" does not hit "with", "ai"
+# does not hit "maintain"); keywords longer than three letters also match
+# their plural ("developer" hits "developers"). Multi-word keywords
+# ("machine learning", "full-stack") match the same words in sequence,
+# whatever punctuation separates them.
+
+import re
+from functools import lru_cache
+from typing import Iterable, Mapping, Optional
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def _variants(words: tuple[str, ...]) -> list[tuple[str, ...]]:
+    """The keyword's words, plus its plural if the last word has one."""
+    last = words[-1]
+    if len(last) > 3 and last[-1].isalpha() and not last.endswith("s"):
+        return [words, words[:-1] + (last + "s",)]
+    return [words]
+
+
+class KeywordMatcher:
+    """Finds which keyword groups occur in a text, in a single pass."""
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]):
+        self.labels = list(groups)
+        self._labels_of: dict[str, set[str]] = {}
+        for label, keywords in groups.items():
+            for keyword in keywords:
+                self._labels_of.setdefault(keyword.lower(), set()).add(label)
+
+        # Single-word keywords are found with one set intersection;
+        # phrases are checked only when their first word occurs.
+        self._single: dict[str, str] = {}
+        self._phrases: dict[str, list[tuple[str, str]]] = {}
+        for keyword in self._labels_of:
+            words = tuple(_words(keyword))
+            if not words:
+                continue
+            for variant in _variants(words):
+                if len(variant) == 1:
+                    self._single.setdefault(variant[0], keyword)
+                else:
+                    self._phrases.setdefault(variant[0], []).append(
+                        (" " + " ".join(variant) + " ", keyword)
+                    )
+        self._single_words = frozenset(self._single)
+        self._phrase_starts = frozenset(self._phrases)
+
+    def keywords(self, text: str) -> set[str]:
+        """All keywords occurring in `text` as whole words."""
+        words = _words(text)
+        present = set(words)
+        found = {self._single[w] for w in present & self._single_words}
+        starts = present & self._phrase_starts
+        if starts:
+            joined = " " + " ".join(words) + " "
+            for start in starts:
+                for phrase, keyword in self._phrases[start]:
+                    if phrase in joined:
+                        found.add(keyword)
+        return found
+
+    def groups(self, text: str) -> set[str]:
+        """Labels of every group with at least one keyword in `text`."""
+        labels: set[str] = set()
+        for keyword in self.keywords(text):
+            labels |= self._labels_of[keyword]
+        return labels
+
+    def first_group(self, text: str) -> Optional[str]:
+        """The first matching label, in the order the groups were given."""
+        labels = self.groups(text)
+        return next((label for label in self.labels if label in labels), None)
+
+
+@lru_cache(maxsize=4096)
+def _single_keyword_matcher(keyword: str) -> KeywordMatcher:
+    return KeywordMatcher({keyword: [keyword]})
+
+
+def contains_keyword(text: str, keyword: str) -> bool:
+    """Whole-word test for one keyword, with the matcher's semantics."""
+    return bool(_single_keyword_matcher(keyword.lower()).keywords(text))
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, Enum, Boolean, LargeBinary
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 import enum
 # Import the Base from our database.py file
 from .database import Base
@@ -71,6 +71,10 @@ class Student(Base):
     resume_text = Column(Text, nullable=True)
     resume_s3_url = Column(Text, nullable=True)
     profile_picture_url = Column(Text, nullable=True)
+    # Bumped by user_api on every write that can change recommendations
+    # (role, keywords, skills, summary, projects). The recommendation
+    # service keys its caches on it.
+    profile_version = Column(Integer, nullable=False, default=0, server_default='0')
 
     skills = relationship(
         "Skill",
@@ -119,6 +123,17 @@ class Internship(Base):
     url = Column(String, unique=True)  # The source URL of the job posting
     source = Column(String)  # e.g., 'LinkedIn', 'Seek', etc.
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped when the crawler rewrites a posting in place (same URL, new
+    # title or description), so the recommender re-indexes it.
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Set by the crawler when this posting is a near-duplicate of another
+    # (the same job on another site, or a recrawl under a new URL); points
+    # at the cluster's canonical posting. Only canonical postings are indexed.
+    duplicate_of = Column(Integer, ForeignKey("internships.id"), nullable=True, index=True)
+    # The posting's MinHash signature (shared.core.dedup.encode_signature),
+    # written by the crawler; NULL until computed. Only the crawler reads
+    # it, so it is not loaded with the row.
+    minhash = deferred(Column(LargeBinary, nullable=True))
 
 
 class Skill(Base):
@@ -196,3 +211,22 @@ class Notification(Base):
 
     student = relationship("Student", back_populates="notifications")
     internship = relationship("Internship")
+
+
+class StudentRecommendation(Base):
+    """
+    Precomputed top-N recommendations, bulk-written by the recommendation
+    service's materialization job. profile_version records the profile the
+    rows were computed from, so stale rows can be detected on read.
+    """
+    __tablename__ = "student_recommendations"
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey('students.id'), index=True, nullable=False)
+    internship_id = Column(Integer, ForeignKey('internships.id'), nullable=False)
+    rank = Column(Integer, nullable=False)
+    match_reason = Column(Text, nullable=True)
+    model_version = Column(String, nullable=False)
+    profile_version = Column(Integer, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    internship = relationship("Internship")
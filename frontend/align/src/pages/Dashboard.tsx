@@ -138,7 +138,7 @@ const Dashboard: React.FC = () => {
         try {
           const res = await axios.get(
             `${RECOMMENDATION_SERVICE_URL}/recommendations/${user.id}`,
-            { timeout: 10000 }
+            { params: { reasons: false }, timeout: 10000 }
           );
           if (!mounted) { stopPolling(); return; }
           if (!res.data.computing) {
@@ -165,9 +165,12 @@ const Dashboard: React.FC = () => {
       setIsLoadingRecs(true);
       setRecsComputing(false);
       try {
+        // Long-poll: the backend holds the request up to `wait` seconds
+        // while it computes, so usually no follow-up polling is needed.
+        // Match reasons are not shown here, so skip them.
         const res = await axios.get(
           `${RECOMMENDATION_SERVICE_URL}/recommendations/${user.id}`,
-          { timeout: 10000 }
+          { params: { wait: 20, reasons: false }, timeout: 25000 }
         );
         if (!mounted) return;
         if (res.data.computing) {
@@ -277,9 +277,11 @@ const JobsPage: React.FC = () => {
             setIsLoadingRecommendations(true);
             setRecsComputing(false);
             try {
+                // Long-poll: held server-side until results are ready or
+                // `wait` seconds pass; polling below is only a fallback.
                 const res = await axios.get(
                     `${RECOMMENDATION_SERVICE_URL}/recommendations/${user.id}`,
-                    { timeout: 15000 }
+                    { params: { wait: 20 }, timeout: 25000 }
                 );
                 if (!mounted) return;
                 if (res.data.computing) {